@@ -0,0 +1,208 @@
+"""
+ASGI entry point serving the movie read routes on SQLAlchemy's asyncio engine
+
+    uvicorn asgi:application
+
+GET /movie/, /movie/<id> and /movie/search run as async handlers built on the
+same models and query builders as the Flask views, so a request waiting on the
+database does not hold a worker thread. They send the same ETag and
+Last-Modified validators and answer conditional requests with 304 like the
+Flask views. Every other route is delegated to the Flask app.
+"""
+import json
+import re
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import func, select
+from werkzeug.datastructures import MultiDict
+
+from app import app
+from core.compression import compress, negotiate, weak_etag
+from core.conditional import is_not_modified, request_conditions, validators
+from core.log import end_request, request_id, start_request
+from core.serializer import serialize
+from db.async_engine import create_async_session
+from db.models.movie import Movie
+from db.models.movie_count import MovieCount
+from db.projection import parse_fields, project, response_fields
+from db.queries import movie_list_query, movie_search_query, split_page
+
+Session = create_async_session(app)
+flask_application = WsgiToAsgi(app)
+
+
+async def list_movies(args, conditions):
+    """
+    Get all movies in the requested page, same parameters as GET /movie
+    """
+    app.logger.info("GET /movie request received.")
+    try:
+        # the query is only built in the app context, it is executed on the async engine
+        with app.app_context():
+            listing = movie_list_query(args)
+            statement = listing["query"].statement
+    except ValueError as e:
+        app.logger.error(str(e))
+        return {"message": str(e)}, 400, {}
+
+    total = None
+    async with Session() as session:
+        if listing["check_page"]:
+            # same maintained counter as db.counts.movie_count
+            counter = await session.get(MovieCount, "movies")
+            if counter is not None:
+                total = counter.count
+            else:
+                total = await session.scalar(select(func.count()).select_from(Movie))
+            if not total:
+                app.logger.error("No movies found")
+                return {"message": "No movies found"}, 400, {}
+            if listing["page"] > total // listing["movies_per_page"] + 1:
+                app.logger.error("Invalid page number")
+                return {"message": "Invalid page number"}, 400, {}
+
+        movies = (await session.scalars(statement)).all()
+
+    return movies_response(movies, listing, conditions, total)
+
+
+async def search_movies(args, conditions):
+    """
+    Get all movies that match the search criteria, same parameters as GET /movie/search
+    """
+    app.logger.info("GET /movie/search request received.")
+    try:
+        with app.app_context():
+            listing = movie_search_query(args)
+            statement = listing["query"].statement
+    except ValueError as e:
+        app.logger.error(str(e))
+        return {"message": str(e)}, 400, {}
+
+    async with Session() as session:
+        movies = (await session.scalars(statement)).all()
+
+    return movies_response(movies, listing, conditions)
+
+
+async def get_movie(args, conditions, movie_id: str):
+    """
+    Get a movie by id
+    """
+    app.logger.info("GET /movie/<movie_id> request received.")
+    try:
+        field_names = parse_fields(args.get("fields", "", type=str))
+    except ValueError as e:
+        app.logger.error(str(e))
+        return {"message": str(e)}, 400, {}
+
+    statement = project(select(Movie), field_names).where(Movie.id == int(movie_id))
+    async with Session() as session:
+        movie = await session.scalar(statement)
+    if not movie:
+        app.logger.error("movie with id %s does not exist", movie_id)
+        return {"message": "Movie does not exist"}, 400, {}
+
+    headers = validators([movie])
+    if is_not_modified(headers, conditions):
+        app.logger.info("Movie not modified id: %s", movie.id)
+        return None, 304, headers
+
+    app.logger.info("Movie retrieved successfully id: %s", movie.id)
+    return serialize(movie, response_fields(field_names)), 200, headers
+
+
+def movies_response(movies: list, listing: dict, conditions, total: int = None):
+    """
+    Marshal a list or search page, with the same pagination and validator
+    headers as the sync views
+    """
+    movies, headers = split_page(movies, listing, total)
+
+    if not movies:
+        app.logger.error("No movies found")
+        return {"message": "No movies found"}, 400, headers
+
+    # answer conditional requests before serializing the movies
+    headers.update(validators(movies, headers, last_modified=False))
+    if is_not_modified(headers, conditions):
+        app.logger.info("Movies not modified")
+        return None, 304, headers
+
+    app.logger.info("Movies retrieved successfully")
+    return serialize(movies, listing["fields"]), 200, headers
+
+
+def response_body(data, code: int, headers: dict, accept_encoding: str):
+    """
+    The headers and body of a JSON response, compressed the same way as the
+    Flask responses
+    """
+    if code == 304:
+        return headers, b""
+    body = json.dumps(data).encode("utf-8") + b"\n"
+    if code != 200:
+        return headers, body
+
+    headers = dict(headers, Vary="Accept-Encoding")
+    encoding = negotiate(accept_encoding, app.extensions["compression"])
+    if encoding is None or len(body) < app.config["COMPRESS_MIN_SIZE"]:
+        return headers, body
+    headers["Content-Encoding"] = encoding
+    if "ETag" in headers:
+        headers["ETag"] = weak_etag(headers["ETag"])
+    return headers, compress(body, encoding)
+
+
+ROUTES = [
+    (re.compile(r"^/movie/?$"), list_movies),
+    (re.compile(r"^/movie/search/?$"), search_movies),
+    (re.compile(r"^/movie/(?P<movie_id>\d+)$"), get_movie),
+]
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await Session.kw["bind"].dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "http" and scope["method"] == "GET":
+        for pattern, handler in ROUTES:
+            match = pattern.match(scope["path"])
+            if match:
+                request_headers = dict(scope["headers"])
+                # same correlation id and log sampling as the Flask requests
+                tokens = start_request(
+                    request_headers.get(b"x-request-id", b"").decode("latin-1"),
+                    app.config["LOG_INFO_SAMPLE_RATE"],
+                )
+                try:
+                    args = MultiDict(
+                        parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+                    )
+                    conditions = request_conditions(request_headers)
+                    data, code, headers = await handler(args, conditions, **match.groupdict())
+                    headers = dict(headers, **{"X-Request-ID": request_id.get()})
+                    accept_encoding = request_headers.get(b"accept-encoding", b"")
+                    headers, body = response_body(data, code, headers, accept_encoding.decode("latin-1"))
+                    await send(
+                        {
+                            "type": "http.response.start",
+                            "status": code,
+                            "headers": [(b"content-type", b"application/json")]
+                            + [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+                        }
+                    )
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                finally:
+                    end_request(tokens)
+
+    await flask_application(scope, receive, send)
@@ -0,0 +1,132 @@
+"""
+Load test of the list and search routes served by the sync (threaded WSGI)
+and the async (uvicorn asgi:application) modes at high concurrency.
+
+Usage: python benchmarks/async_load.py [movies] [concurrency] [requests]
+
+Needs uvicorn and httpx next to the app requirements.
+"""
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+directory = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(directory, "bench.db")
+os.environ.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", "0")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["PYTHONPATH"] = ROOT
+# the async mode has no response cache, compare the database paths only
+os.environ["CACHE_TYPE"] = "null"
+
+from flask_migrate import upgrade  # noqa: E402
+
+from app import app  # noqa: E402
+from init import init_migrate  # noqa: E402
+from db import db  # noqa: E402
+from db.bulk import import_movies, iter_records  # noqa: E402
+from db.models.user import User  # noqa: E402
+
+SERVERS = {
+    "sync": [sys.executable, "-c", "from app import app; app.run(port=8001, threaded=True)"],
+    "async": [sys.executable, "-m", "uvicorn", "asgi:application", "--port", "8002", "--log-level", "warning"],
+}
+PORTS = {"sync": 8001, "async": 8002}
+ROUTES = {
+    "list": "/movie/?page=3&movies_per_page=20&sort_by=release_date",
+    "search": "/movie/search?search_param=title&search_value=movie 12&movies_per_page=20",
+}
+
+
+def seed(movies: int):
+    rows = (
+        json.dumps(
+            {
+                "title": "movie {}".format(i),
+                "description": "a description of movie {}".format(i),
+                "release_date": "20{:02d}-01-01".format(i % 24),
+                "director": "director {}".format(i % 100),
+                "genre": ["action", "comedy", "drama"][i % 3],
+                "avg_rating": 1 + i % 10,
+                "ticket_price": 100 + i % 50,
+                "cast": "actor {}, actor {}".format(i, i + 1),
+            }
+        )
+        for i in range(movies)
+    )
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+        user = User(name="Bench", email="bench@example.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+        body = io.BytesIO("\n".join(rows).encode("utf-8"))
+        import_movies(iter_records(body, "ndjson"), user.id)
+
+
+async def load(url: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    movies = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    seed(movies)
+
+    for mode, command in SERVERS.items():
+        server = subprocess.Popen(command, cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = "http://127.0.0.1:{}".format(PORTS[mode])
+            for _ in range(50):
+                try:
+                    httpx.get(base + "/movie/1")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.2)
+            for route, path in ROUTES.items():
+                result = asyncio.run(load(base + path, concurrency, requests))
+                print(
+                    "{:5} {:6}: {:7.1f} req/s  p50 {:7.1f} ms  p99 {:7.1f} ms".format(
+                        mode, route, result["throughput"], result["p50"], result["p99"]
+                    )
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
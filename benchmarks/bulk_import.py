@@ -0,0 +1,86 @@
+"""
+Throughput of the bulk movie import against one POST /movie per movie.
+
+Usage: python benchmarks/bulk_import.py [rows] [batch_size]
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+directory = tempfile.mkdtemp()
+
+from flask_migrate import upgrade  # noqa: E402
+
+from init import create_app, init_migrate  # noqa: E402
+from db import db  # noqa: E402
+from db.bulk import import_movies, iter_records  # noqa: E402
+from db.models.user import User  # noqa: E402
+
+app = create_app(
+    {
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "bench.db"),
+        "SECRET_KEY": "bench",
+        "LOG_FILE": os.path.join(directory, "app.log"),
+    }
+)
+
+
+def movie(i: int) -> dict:
+    return {
+        "title": "movie {}".format(i),
+        "description": "a description of movie {}".format(i),
+        "release_date": "2019-04-23",
+        "director": "director {}".format(i % 100),
+        "genre": ["action", "comedy", "drama"][i % 3],
+        "avg_rating": 1 + i % 10,
+        "ticket_price": 100 + i % 50,
+        "cast": "actor {}, actor {}".format(i, i + 1),
+    }
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    body = "\n".join(json.dumps(movie(i)) for i in range(rows)).encode("utf-8")
+
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+        user = User(name="Bench", email="bench@example.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+
+        start = time.perf_counter()
+        report = import_movies(iter_records(io.BytesIO(body), "ndjson"), user.id, batch_size)
+        elapsed = time.perf_counter() - start
+        print(
+            "bulk import: {} rows in {:.2f}s, {:.0f} rows/s".format(
+                report["imported"], elapsed, report["imported"] / elapsed
+            )
+        )
+
+    # the same movies one request at a time, on a sample to keep it short
+    client = app.test_client()
+    client.post(
+        "/user/register",
+        json={"name": "Bench", "email": "single@example.com", "password": "Bench1234"},
+    )
+    client.post("/user/login", json={"email": "single@example.com", "password": "Bench1234"})
+    sample = min(rows, 1000)
+    start = time.perf_counter()
+    for i in range(sample):
+        client.post("/movie/", json=movie(i))
+    elapsed = time.perf_counter() - start
+    print(
+        "POST /movie: {} rows in {:.2f}s, {:.0f} rows/s".format(
+            sample, elapsed, sample / elapsed
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Login throughput per core for different bcrypt costs.
+
+Usage: python benchmarks/login.py [concurrent clients] [logins per client]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+directory = tempfile.mkdtemp()
+
+from flask_migrate import upgrade  # noqa: E402
+
+from init import create_app, init_migrate  # noqa: E402
+
+app = create_app(
+    {
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "bench.db"),
+        "SECRET_KEY": "bench",
+        "LOG_FILE": os.path.join(directory, "app.log"),
+    }
+)
+
+PASSWORD = "Bench1234"
+
+
+def login_throughput(clients: int, logins: int, email: str) -> float:
+    def run():
+        client = app.test_client()
+        for _ in range(logins):
+            response = client.post("/user/login", json={"email": email, "password": PASSWORD})
+            assert response.status_code == 200, response.get_json()
+
+    threads = [threading.Thread(target=run) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return clients * logins / (time.perf_counter() - start)
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    cores = os.cpu_count() or 1
+
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+
+    client = app.test_client()
+    for rounds in (10, 12):
+        app.config["BCRYPT_ROUNDS"] = rounds
+        email = "bench{}@example.com".format(rounds)
+        client.post("/user/register", json={"name": "Bench", "email": email, "password": PASSWORD})
+        throughput = login_throughput(clients, logins, email)
+        print(
+            "rounds {}: {:.1f} logins/s, {:.1f} logins/s per core ({} cores, {} hashing workers)".format(
+                rounds, throughput, throughput / cores, cores, app.config["HASHING_WORKERS"]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
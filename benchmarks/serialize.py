@@ -0,0 +1,63 @@
+"""
+Time to serialize a page of movies with flask_restx marshal and with the
+compiled serializer, checking both give the same JSON.
+
+Usage: python benchmarks/serialize.py [rows per page] [pages]
+"""
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask_restx import marshal  # noqa: E402
+
+from core.serializer import serialize  # noqa: E402
+from db.models.movie import Movie  # noqa: E402
+from db.models.user import User  # noqa: E402, F401 (needed by the Movie.user relationship)
+from schemas.movie import movie_data_response  # noqa: E402
+
+
+def movie(i: int) -> Movie:
+    return Movie(
+        id=i,
+        title="movie {}".format(i),
+        description="a description of movie {}".format(i) * 5,
+        release_date=date(2000 + i % 20, 1 + i % 12, 1 + i % 28),
+        director="director {}".format(i % 100),
+        genre=["action", "comedy", "drama"][i % 3],
+        avg_rating=1 + i % 10,
+        ticket_price=100.5 + i % 50,
+        cast="actor {}, actor {}".format(i, i + 1),
+        user_id=1,
+    )
+
+
+def timed(function, rows: list, pages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(pages):
+        function(rows, movie_data_response)
+    return (time.perf_counter() - start) / pages
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rows = [movie(i) for i in range(size)]
+
+    expected = json.dumps(marshal(rows, movie_data_response))
+    assert json.dumps(serialize(rows, movie_data_response)) == expected
+
+    marshal_time = timed(marshal, rows, pages)
+    serialize_time = timed(serialize, rows, pages)
+    print("{} rows per page, {} pages".format(size, pages))
+    print("marshal:    {:8.3f} ms per page".format(marshal_time * 1000))
+    print("serializer: {:8.3f} ms per page ({:.1f}x)".format(
+        serialize_time * 1000, marshal_time / serialize_time
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold start time of a worker and of the flask CLI commands, each measured in
+new processes: interpreter start, importing init (no app built), create_app(),
+create_app() and the first request (GET /movie/1), flask --help and
+flask db_create on a new SQLite database.
+
+Usage: python benchmarks/startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+FIRST_REQUEST = (
+    "from init import create_app; "
+    "assert create_app().test_client().get('/movie/1').status_code < 500"
+)
+
+
+def timed(command: list, env: dict, runs: int, before=None) -> float:
+    """
+    Median wall time of command in milliseconds
+    """
+    times = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, "startup.db")
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        SQLALCHEMY_DATABASE_URI="sqlite:///" + database,
+        SQLALCHEMY_TRACK_MODIFICATIONS="0",
+        SECRET_KEY="bench",
+        LOG_FILE=os.path.join(directory, "app.log"),
+    )
+    flask = [sys.executable, "-m", "flask", "--app", os.path.join(ROOT, "app.py")]
+
+    def remove_database():
+        if os.path.exists(database):
+            os.remove(database)
+
+    # db_create runs first and leaves the schema for the first request
+    cases = [
+        ("flask db_create", flask + ["db_create"], remove_database),
+        ("interpreter", [sys.executable, "-c", "pass"], None),
+        ("import init", [sys.executable, "-c", "import init"], None),
+        ("create_app", [sys.executable, "-c", "from init import create_app; create_app()"], None),
+        ("first request", [sys.executable, "-c", FIRST_REQUEST], None),
+        ("flask --help", flask + ["--help"], None),
+    ]
+    print("median of {} runs".format(runs))
+    for name, command, before in cases:
+        print("{:16} {:8.1f} ms".format(name, timed(command, env, runs, before)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Benchmark suite of the list, detail, search, login and bulk import routes.
+
+Seeds a catalog of --movies movies, drives every workload through the Flask
+test client and a local threaded server, and writes p50/p95/p99 latency and
+throughput per driver and workload to a JSON file named after the commit, so
+runs can be compared across commits.
+
+Usage:
+    python benchmarks/suite.py run [--movies N] [--requests N] [--concurrency N]
+        [--database-uri URI] [--drivers client,server] [--workloads list,...]
+        [--output results.json]
+    python benchmarks/suite.py compare before.json after.json
+
+The default database is a new SQLite file, pass --database-uri to run against
+Postgres. A database already holding --movies movies is reused as is, which
+saves seeding the large catalogs again.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+EMAIL = "bench@example.com"
+PASSWORD = "Bench1234"
+PORT = 8010
+WORKLOADS = ["list", "detail", "search", "login", "import"]
+# login is bounded by bcrypt and import writes 100 movies per request, both
+# run fewer requests than the read workloads
+REQUEST_SHARE = {"login": 0.1, "import": 0.1}
+IMPORT_ROWS = 100
+
+
+def movie(i: int) -> dict:
+    return {
+        "title": "movie {}".format(i),
+        "description": "a description of movie {}".format(i),
+        "release_date": "{}-{:02d}-{:02d}".format(1950 + i % 70, 1 + i % 12, 1 + i % 28),
+        "director": "director {}".format(i % 1000),
+        "genre": ["action", "comedy", "drama", "horror", "romance"][i % 5],
+        "avg_rating": 1 + i % 10,
+        "ticket_price": 100 + i % 500,
+        "cast": "actor {}, actor {}".format(i % 5000, (i + 1) % 5000),
+    }
+
+
+def setup(database_uri: str, movies: int, directory: str):
+    """
+    Create the schema, the benchmark user and the catalog, returns the app and a token
+    """
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_uri
+    os.environ.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", "0")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("LOG_FILE", os.path.join(directory, "app.log"))
+    # measure the database paths, not the response cache
+    os.environ.setdefault("CACHE_TYPE", "null")
+    os.environ["PYTHONPATH"] = ROOT
+    sys.path.insert(0, ROOT)
+
+    from flask_migrate import upgrade
+
+    from app import app
+    from core.security import get_hashed_password
+    from db import db
+    from db.bulk import import_movies
+    from db.counts import movie_count
+    from db.models.user import User
+    from init import init_migrate
+
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+        user = User.query.filter_by(email=EMAIL).first()
+        if user is None:
+            user = User(name="Bench", email=EMAIL, password=get_hashed_password(PASSWORD))
+            db.session.add(user)
+            db.session.commit()
+
+        existing = movie_count()
+        if existing < movies:
+            start = time.perf_counter()
+            records = ((i, movie(i)) for i in range(existing, movies))
+            import_movies(records, user.id, 10000)
+            print("seeded {} movies in {:.1f}s".format(movies - existing, time.perf_counter() - start))
+
+    response = app.test_client().post("/user/login", json={"email": EMAIL, "password": PASSWORD})
+    return app, response.get_json()["access_token"]
+
+
+def requests_for(workload: str, count: int, movies: int, token: str, seed: int) -> list:
+    """
+    The (method, path, body, headers) of count requests of a workload, the same for every run
+    """
+    rng = random.Random("{}-{}".format(seed, workload))
+    json_headers = {"Content-Type": "application/json"}
+    requests = []
+    for _ in range(count):
+        if workload == "list":
+            page = rng.randint(1, max(1, min(movies, 10000) // 20))
+            requests.append(("GET", "/movie/?page={}&movies_per_page=20".format(page), None, {}))
+        elif workload == "detail":
+            requests.append(("GET", "/movie/{}".format(rng.randint(1, movies)), None, {}))
+        elif workload == "search":
+            path = "/movie/search?search_param=title&search_value=movie+{}&movies_per_page=20"
+            requests.append(("GET", path.format(rng.randint(0, movies - 1)), None, {}))
+        elif workload == "login":
+            body = json.dumps({"email": EMAIL, "password": PASSWORD}).encode("utf-8")
+            requests.append(("POST", "/user/login", body, json_headers))
+        elif workload == "import":
+            first = rng.randint(0, movies)
+            body = "\n".join(json.dumps(movie(first + i)) for i in range(IMPORT_ROWS))
+            headers = {"Content-Type": "application/x-ndjson", "Authorization": "Bearer " + token}
+            requests.append(("POST", "/movie/import", body.encode("utf-8"), headers))
+    return requests
+
+
+def percentile(latencies: list, p: float) -> float:
+    # nearest rank on sorted latencies
+    return latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)]
+
+
+def summary(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def run_client(app, requests: list) -> dict:
+    """
+    Send the requests one by one through the Flask test client
+    """
+    client = app.test_client()
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for method, path, body, headers in requests:
+        request_start = time.perf_counter()
+        response = client.open(path, method=method, data=body, headers=headers)
+        latencies.append(time.perf_counter() - request_start)
+        errors += response.status_code >= 400
+    return summary(latencies, errors, time.perf_counter() - start)
+
+
+def run_server(requests: list, concurrency: int) -> dict:
+    """
+    Send the requests to the local server from concurrency keep-alive connections
+    """
+    local = threading.local()
+    latencies = []
+    errors = []
+
+    def send(request):
+        method, path, body, headers = request
+        if not hasattr(local, "connection"):
+            local.connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=120)
+        request_start = time.perf_counter()
+        local.connection.request(method, path, body=body, headers=headers)
+        response = local.connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - request_start)
+        if response.status >= 400:
+            errors.append(response.status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, requests))
+    return summary(latencies, len(errors), time.perf_counter() - start)
+
+
+def start_server(directory: str):
+    command = [
+        sys.executable,
+        "-c",
+        "from app import app; app.run(port={}, threaded=True)".format(PORT),
+    ]
+    server = subprocess.Popen(command, cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=5)
+            connection.request("GET", "/movie/1")
+            connection.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("the benchmark server did not start")
+
+
+def commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    directory = tempfile.mkdtemp()
+    database_uri = args.database_uri or "sqlite:///" + os.path.join(directory, "bench.db")
+    app, token = setup(database_uri, args.movies, directory)
+
+    report = {
+        "commit": commit(),
+        "time": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": database_uri.split(":", 1)[0],
+        "movies": args.movies,
+        "concurrency": args.concurrency,
+        "results": [],
+    }
+    drivers = args.drivers.split(",")
+    workloads = args.workloads.split(",")
+    server = start_server(directory) if "server" in drivers else None
+    try:
+        for driver in drivers:
+            for workload in workloads:
+                count = max(1, int(args.requests * REQUEST_SHARE.get(workload, 1)))
+                requests = requests_for(workload, count, args.movies, token, args.seed)
+                if driver == "client":
+                    result = run_client(app, requests)
+                else:
+                    result = run_server(requests, args.concurrency)
+                result = dict(driver=driver, workload=workload, **result)
+                report["results"].append(result)
+                print(
+                    "{driver:6} {workload:7} {requests:6d} req {throughput:8.1f} req/s  p50 {p50_ms:7.2f} ms"
+                    "  p95 {p95_ms:7.2f} ms  p99 {p99_ms:7.2f} ms  errors {errors}".format(**result)
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    output = args.output or os.path.join(
+        RESULTS, "{}-{}-{}.json".format(report["commit"], report["database"], args.movies)
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("results written to {}".format(output))
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    previous = {(result["driver"], result["workload"]): result for result in before["results"]}
+    print("{} -> {}".format(before["commit"], after["commit"]))
+    for result in after["results"]:
+        old = previous.get((result["driver"], result["workload"]))
+        if old is None:
+            continue
+        print(
+            "{:6} {:7} throughput {:+6.1f}%  p50 {:+6.1f}%  p95 {:+6.1f}%  p99 {:+6.1f}%".format(
+                result["driver"],
+                result["workload"],
+                *[
+                    (result[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+                    for key in ["throughput", "p50_ms", "p95_ms", "p99_ms"]
+                ]
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of the movie API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--movies", type=int, default=10000, help="catalog size")
+    run_parser.add_argument("--requests", type=int, default=1000, help="requests per read workload")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="connections of the server driver")
+    run_parser.add_argument("--database-uri", help="database to use instead of a new SQLite file")
+    run_parser.add_argument("--drivers", default="client,server", help="client and/or server")
+    run_parser.add_argument("--workloads", default=",".join(WORKLOADS), help=",".join(WORKLOADS))
+    run_parser.add_argument("--seed", type=int, default=0, help="seed of the request sequence")
+    run_parser.add_argument("--output", help="results file, default benchmarks/results/<commit>-<database>-<movies>.json")
+    run_parser.set_defaults(function=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(function=compare)
+
+    args = parser.parse_args()
+    args.function(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Validation throughput of MovieData and UserRegistrationData payloads, one
+model per payload and whole batches through a list TypeAdapter.
+
+Usage: python benchmarks/validation.py [payloads per batch] [batches]
+"""
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from schemas.movie import MovieData, movie_list_adapter  # noqa: E402
+from schemas.user import UserRegistrationData  # noqa: E402
+
+
+def movie(i: int) -> dict:
+    return {
+        "title": "movie {}".format(i),
+        "description": "a description of movie {}".format(i),
+        "release_date": "{}-{:02d}-{:02d}".format(1950 + i % 70, 1 + i % 12, 1 + i % 28),
+        "director": "director {}".format(i % 100),
+        "genre": ["action", "comedy", "drama"][i % 3],
+        "avg_rating": 1 + i % 10,
+        "ticket_price": 100 + i % 500,
+        "cast": "actor {}, actor {}".format(i, i + 1),
+    }
+
+
+def user(i: int) -> dict:
+    return {"name": "User", "email": "user{}@example.com".format(i), "password": "Secret{}pass".format(i)}
+
+
+def timed(function, payloads: list, batches: int) -> float:
+    """
+    Payloads validated per second
+    """
+    start = time.perf_counter()
+    for _ in range(batches):
+        function(payloads)
+    return len(payloads) * batches / (time.perf_counter() - start)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    user_list_adapter = TypeAdapter(List[UserRegistrationData])
+
+    cases = [
+        ("MovieData", [movie(i) for i in range(size)], MovieData, movie_list_adapter),
+        ("UserRegistrationData", [user(i) for i in range(size)], UserRegistrationData, user_list_adapter),
+    ]
+    print("{} payloads per batch, {} batches".format(size, batches))
+    for name, payloads, model, adapter in cases:
+        single = timed(lambda payloads: [model.model_validate(p) for p in payloads], payloads, batches)
+        batched = timed(adapter.validate_python, payloads, batches)
+        print("{:21} single: {:9.0f}/s  batched: {:9.0f}/s ({:.2f}x)".format(
+            name, single, batched, batched / single
+        ))
+
+
+if __name__ == "__main__":
+    main()
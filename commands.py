@@ -0,0 +1,107 @@
+import json
+import click
+from flask import current_app
+from flask.cli import ScriptInfo, with_appcontext
+
+from db.models.user import User
+from db.search import rebuild_search_index
+from db.bulk import EXPORT_FORMATS, IMPORT_FORMATS, export_movies, import_movies, iter_records
+from db.filters import FILTER_FIELDS, filter_movies
+from db.models.movie import Movie
+
+
+class MigrateGroup(click.Group):
+    """
+    The "flask db" commands of Flask-Migrate, alembic is only imported when
+    one of them runs instead of when the app is created
+    """
+
+    def __init__(self):
+        super().__init__("db", help="Perform database migrations.")
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate.cli import db as db_group
+        from init import init_migrate
+
+        init_migrate(parent.ensure_object(ScriptInfo).load_app())
+        return db_group.make_context(info_name, args, parent=parent, **extra)
+
+
+@click.command("db_create")
+@with_appcontext
+def db_create():
+    from flask_migrate import upgrade
+    from init import init_migrate
+
+    # the schema is owned by the migrations in migrations/versions
+    init_migrate(current_app)
+    upgrade()
+
+    current_app.logger.info("Database has been created successfully!")
+
+
+@click.command("db_rebuild_search")
+@with_appcontext
+def db_rebuild_search():
+    rebuild_search_index()
+
+    current_app.logger.info("Search index has been rebuilt successfully!")
+
+
+@click.command("import_movies")
+@with_appcontext
+@click.argument("path", type=click.File("rb"))
+@click.option("--user-email", required=True, help="owner of the imported movies")
+@click.option("--format", type=click.Choice(IMPORT_FORMATS), default=None)
+@click.option("--batch-size", type=int, default=None)
+def import_movies_command(path, user_email, format, batch_size):
+    user = User.query.filter_by(email=user_email).first()
+    if not user:
+        raise click.BadParameter("User does not exist", param_hint="--user-email")
+    if format is None:
+        format = "csv" if path.name.endswith(".csv") else "ndjson"
+
+    report = import_movies(
+        iter_records(path, format),
+        user.id,
+        batch_size or current_app.config["IMPORT_BATCH_SIZE"],
+    )
+    for error in report["errors"]:
+        click.echo(json.dumps(error, default=str), err=True)
+
+    current_app.logger.info(
+        "Movies imported: %s failed: %s", report["imported"], report["failed"]
+    )
+
+
+@click.command("export_movies")
+@with_appcontext
+@click.argument("path", type=click.File("w"))
+@click.option("--format", type=click.Choice(EXPORT_FORMATS), default=None)
+@click.option("--filter-by", type=click.Choice(FILTER_FIELDS), default=None)
+@click.option("--filter-value", default="")
+@click.option("--release-year-from", default="")
+@click.option("--release-year-to", default="")
+def export_movies_command(path, format, filter_by, filter_value, release_year_from, release_year_to):
+    if format is None:
+        format = "csv" if path.name.endswith(".csv") else "ndjson"
+    try:
+        query = filter_movies(
+            Movie.query, filter_by, filter_value, release_year_from, release_year_to
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    for chunk in export_movies(query, format):
+        path.write(chunk)
+
+    current_app.logger.info("Movies exported successfully!")
+
+
+def init_commands(app):
+    """
+    Register the flask CLI commands
+    """
+    app.cli.add_command(MigrateGroup())
+    for command in [db_create, db_rebuild_search, import_movies_command, export_movies_command]:
+        app.cli.add_command(command)
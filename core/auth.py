@@ -0,0 +1,41 @@
+from functools import wraps
+
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_login import current_user
+from jwt.exceptions import PyJWTError
+
+
+def auth_required(f):
+    """
+    Require a signed access token (Authorization: Bearer <token>) or a logged
+    in session.
+
+    The token carries the user id in its claims, so token requests are
+    authorized without loading the user from the database.
+    The id of the authenticated user is available from current_user_id().
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if request.headers.get("Authorization"):
+            try:
+                verify_jwt_in_request()
+            except (JWTExtendedException, PyJWTError) as e:
+                return {"message": str(e)}, 401
+            g.user_id = int(get_jwt_identity())
+        elif current_user.is_authenticated:
+            g.user_id = current_user.id
+        else:
+            return {"message": "Authentication required"}, 401
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def current_user_id() -> int:
+    """
+    Id of the user authenticated by auth_required
+    """
+    return g.user_id
@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, request
+from flask_restx.utils import unpack
+
+
+class BaseCache:
+    """
+    Response cache with hit/miss counters.
+
+    Entries are grouped, bumping the generation of a group makes every entry
+    stored under the previous generation unreachable, which is how the write
+    handlers invalidate exactly the responses they may have changed.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value):
+        raise NotImplementedError
+
+    def generation(self, group: str) -> int:
+        raise NotImplementedError
+
+    def bump(self, group: str):
+        raise NotImplementedError
+
+
+class NullCache(BaseCache):
+    """
+    Cache that never stores anything
+    """
+
+    def _get(self, key: str):
+        return None
+
+    def set(self, key: str, value):
+        pass
+
+    def generation(self, group: str) -> int:
+        return 0
+
+    def bump(self, group: str):
+        pass
+
+
+class LRUCache(BaseCache):
+    """
+    In-process cache bounded by max_size entries, each living at most ttl seconds
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: int = 60):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # generations are kept apart so they are never evicted
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def generation(self, group: str) -> int:
+        return self._generations.get(group, 0)
+
+    def bump(self, group: str):
+        with self._lock:
+            self._generations[group] = self._generations.get(group, 0) + 1
+
+
+class RedisCache(BaseCache):
+    """
+    Cache shared between workers, client is any Redis compatible client
+    (redis.Redis or a local stand-in implementing get, set, incr)
+    """
+
+    def __init__(self, client, ttl: int = 60, prefix: str = "movie_api:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def generation(self, group: str) -> int:
+        return int(self.client.get(self.prefix + "generation:" + group) or 0)
+
+    def bump(self, group: str):
+        self.client.incr(self.prefix + "generation:" + group)
+
+
+def init_cache(app):
+    """
+    Create the response cache configured by CACHE_TYPE ("lru", "redis" or "null")
+    """
+    cache_type = app.config["CACHE_TYPE"]
+    if cache_type == "lru":
+        cache = LRUCache(app.config["CACHE_MAX_SIZE"], app.config["CACHE_TTL"])
+    elif cache_type == "redis":
+        # redis is only required when the redis backend is used
+        import redis
+
+        client = redis.Redis.from_url(app.config["CACHE_REDIS_URL"])
+        cache = RedisCache(client, app.config["CACHE_TTL"])
+    elif cache_type == "null":
+        cache = NullCache()
+    else:
+        raise ValueError("Invalid CACHE_TYPE {}".format(cache_type))
+
+    app.extensions["cache"] = cache
+    return cache
+
+
+def cached(group):
+    """
+    Cache the successful responses of a view in group.
+
+    group is a string or a function of the view arguments returning one, the
+    cache key is made of the group generation, the path, the sorted query args
+    and whether the view reads from a replica. Apply read_replica outside of
+    cached, so a client sent to the primary after a write never gets a
+    response read from a lagging replica.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions["cache"]
+            name = group(**kwargs) if callable(group) else group
+            args_key = "&".join(
+                "{}={}".format(key, value)
+                for key, value in sorted(request.args.items(multi=True))
+            )
+            source = "replica" if g.get("read_replica") else "primary"
+            key = "{}:{}:{}:{}?{}".format(
+                name, cache.generation(name), source, request.path, args_key
+            )
+
+            response = cache.get(key)
+            if response is not None:
+                data, code, headers = response
+                return data, code, dict(headers, **{"X-Cache": "HIT"})
+
+            data, code, headers = unpack(f(*args, **kwargs))
+            headers = dict(headers or {})
+            if code == 200:
+                cache.set(key, [data, code, headers])
+            return data, code, dict(headers, **{"X-Cache": "MISS"})
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*groups):
+    """
+    Drop every cached response of groups
+    """
+    cache = current_app.extensions["cache"]
+    for name in groups:
+        cache.bump(name)
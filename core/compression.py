@@ -0,0 +1,148 @@
+import zlib
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+# response types worth compressing
+COMPRESSIBLE_MIMETYPES = ["application/json", "application/x-ndjson", "text/csv"]
+
+
+class GzipCompressor:
+    def __init__(self):
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # flush every chunk so a streamed response is sent as it is produced
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        import brotli
+
+        # quality 11 is far too slow for dynamic responses
+        self.compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        import zstandard
+
+        self.compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(self.flush_block)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+COMPRESSORS = {"br": BrotliCompressor, "zstd": ZstdCompressor, "gzip": GzipCompressor}
+
+
+def available_encodings(names: list) -> list:
+    """
+    The encodings of names, in order, whose compression library is installed
+    """
+    encodings = []
+    for name in names:
+        if name not in COMPRESSORS:
+            raise ValueError("Invalid compression algorithm {}".format(name))
+        try:
+            COMPRESSORS[name]()
+        except ImportError:
+            # brotli and zstandard are only required when they are used
+            continue
+        encodings.append(name)
+    return encodings
+
+
+def negotiate(accept_encoding: str, encodings: list) -> str:
+    """
+    The preferred encoding of the client among encodings, or None
+    """
+    if not accept_encoding or not encodings:
+        return None
+    return parse_accept_header(accept_encoding).best_match(encodings)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    compressor = COMPRESSORS[encoding]()
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_chunks(chunks, encoding: str):
+    """
+    Compress an iterable of str or bytes chunks, one compressed chunk per chunk
+    """
+    compressor = COMPRESSORS[encoding]()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def weak_etag(etag: str) -> str:
+    """
+    The compressed body is a different representation, its ETag becomes weak
+    """
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def init_compression(app):
+    """
+    Compress the responses negotiated with Accept-Encoding.
+
+    COMPRESS_ALGORITHMS lists the encodings by preference, the ones whose
+    library is not installed are left out. Buffered responses smaller than
+    COMPRESS_MIN_SIZE bytes are sent as is, streamed ones are always compressed.
+    """
+    encodings = available_encodings(app.config["COMPRESS_ALGORITHMS"])
+    app.extensions["compression"] = encodings
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate(request.headers.get("Accept-Encoding"), encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_chunks(response.response, encoding)
+            response.direct_passthrough = False
+            response.headers.pop("Content-Length", None)
+        elif response.content_length < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        else:
+            response.set_data(compress(response.get_data(), encoding))
+
+        response.headers["Content-Encoding"] = encoding
+        if "ETag" in response.headers:
+            response.headers["ETag"] = weak_etag(response.headers["ETag"])
+        return response
+
+    return encodings
@@ -0,0 +1,82 @@
+import hashlib
+import json
+from functools import wraps
+
+from flask import request
+from flask_restx.utils import unpack
+from werkzeug.http import http_date, parse_date
+from werkzeug.wrappers import Request
+
+
+def validators(rows, extra: dict = None, last_modified: bool = True) -> dict:
+    """
+    ETag and Last-Modified headers for a list of rows with id and updated_at.
+
+    The ETag is strong: it changes whenever a row is added, removed, reordered
+    or updated, or a value of extra (e.g. the pagination headers) changes,
+    without having to serialize the rows.
+
+    Last-Modified, the newest updated_at of the rows, is only right for a
+    single row: a page whose rows were deleted, inserted or reordered keeps
+    the same newest updated_at. Pages pass last_modified=False and rely on
+    the ETag alone.
+    """
+    digest = hashlib.sha1(json.dumps(extra or {}, sort_keys=True).encode("utf-8"))
+    newest = None
+    for row in rows:
+        digest.update("{}:{};".format(row.id, row.updated_at).encode("utf-8"))
+        if row.updated_at and (newest is None or row.updated_at > newest):
+            newest = row.updated_at
+
+    headers = {"ETag": '"{}"'.format(digest.hexdigest())}
+    if last_modified and newest is not None:
+        headers["Last-Modified"] = http_date(newest)
+    return headers
+
+
+def is_not_modified(headers: dict, conditions: Request = None) -> bool:
+    """
+    Check the If-None-Match / If-Modified-Since headers of conditions (the
+    current request by default) against the validators of the response
+    """
+    conditions = conditions or request
+    etag = headers.get("ETag")
+    if conditions.if_none_match:
+        # If-Modified-Since is ignored when If-None-Match is sent, the weak
+        # comparison matches the weak ETag of compressed responses too
+        return etag is not None and conditions.if_none_match.contains_weak(etag.strip('"'))
+
+    last_modified = headers.get("Last-Modified")
+    if conditions.if_modified_since and last_modified:
+        return conditions.if_modified_since >= parse_date(last_modified)
+    return False
+
+
+def request_conditions(headers: dict) -> Request:
+    """
+    Request holding the If-None-Match / If-Modified-Since headers of an ASGI
+    request, whose header names and values are bytes
+    """
+    environ = {}
+    for name in (b"if-none-match", b"if-modified-since"):
+        if name in headers:
+            key = "HTTP_" + name.decode("latin-1").upper().replace("-", "_")
+            environ[key] = headers[name].decode("latin-1")
+    return Request(environ)
+
+
+def conditional(f):
+    """
+    Answer 304 Not Modified when a successful response has not changed
+    since the validators sent by the client
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        data, code, headers = unpack(f(*args, **kwargs))
+        headers = dict(headers or {})
+        if code == 200 and is_not_modified(headers):
+            return None, 304, headers
+        return data, code, headers
+
+    return wrapper
@@ -2,15 +2,82 @@ from dotenv import load_dotenv
 import os
 from datetime import timedelta
 
-load_dotenv()
 
-
-class AppConfig:
+def load_config() -> dict:
     """
-    Application configuration
+    Application configuration, read from the environment (and .env) when the
+    app is created. Every setting has a default, so create_app(config) works
+    without any environment.
     """
+    load_dotenv()
 
-    SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
-    SQLALCHEMY_TRACK_MODIFICATIONS = int(os.getenv("SQLALCHEMY_TRACK_MODIFICATIONS"))
-    SECRET_KEY = os.getenv("SECRET_KEY")
-    # TOKEN_EXPIRE_TIME = timedelta(seconds=int(os.getenv('TOKEN_EXPIRE_TIME')))
+    return {
+        "SQLALCHEMY_DATABASE_URI": os.getenv("SQLALCHEMY_DATABASE_URI"),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": bool(int(os.getenv("SQLALCHEMY_TRACK_MODIFICATIONS", 0))),
+        # connection pool settings, only the ones set in the environment are passed on
+        "SQLALCHEMY_ENGINE_OPTIONS": {
+            option: cast(os.getenv(variable))
+            for option, variable, cast in [
+                ("pool_size", "DB_POOL_SIZE", int),
+                ("max_overflow", "DB_MAX_OVERFLOW", int),
+                ("pool_timeout", "DB_POOL_TIMEOUT", int),
+                ("pool_recycle", "DB_POOL_RECYCLE", int),
+                ("pool_pre_ping", "DB_POOL_PRE_PING", lambda value: bool(int(value))),
+            ]
+            if os.getenv(variable)
+        },
+        # comma separated read replica URIs, used by the GET routes
+        "SQLALCHEMY_BINDS": {
+            "replica_{}".format(index): uri.strip()
+            for index, uri in enumerate(os.getenv("SQLALCHEMY_REPLICA_URIS", "").split(","))
+            if uri.strip()
+        },
+        # seconds a client reads from the primary after a write
+        "REPLICA_STICKY_SECONDS": int(os.getenv("REPLICA_STICKY_SECONDS", 5)),
+        "SECRET_KEY": os.getenv("SECRET_KEY"),
+        # response cache of the movie GET endpoints: "lru", "redis" or "null"
+        "CACHE_TYPE": os.getenv("CACHE_TYPE", "lru"),
+        "CACHE_MAX_SIZE": int(os.getenv("CACHE_MAX_SIZE", 1024)),
+        "CACHE_TTL": int(os.getenv("CACHE_TTL", 60)),
+        "CACHE_REDIS_URL": os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+        # movies_per_page default and bounds of the list and search routes
+        "MOVIES_PER_PAGE_DEFAULT": int(os.getenv("MOVIES_PER_PAGE_DEFAULT", 10)),
+        "MOVIES_PER_PAGE_MIN": int(os.getenv("MOVIES_PER_PAGE_MIN", 1)),
+        "MOVIES_PER_PAGE_MAX": int(os.getenv("MOVIES_PER_PAGE_MAX", 100)),
+        # most rows (offset + limit) a page of the list and search routes may read,
+        # deeper pages have to use cursor pagination
+        "MOVIE_LIST_ROW_BUDGET": int(os.getenv("MOVIE_LIST_ROW_BUDGET", 10000)),
+        "MOVIE_SEARCH_ROW_BUDGET": int(os.getenv("MOVIE_SEARCH_ROW_BUDGET", 1000)),
+        # Accept-Encoding values by preference, br and zstd need the brotli and
+        # zstandard packages, responses smaller than COMPRESS_MIN_SIZE bytes are not compressed
+        "COMPRESS_ALGORITHMS": os.getenv("COMPRESS_ALGORITHMS", "br,zstd,gzip").split(","),
+        "COMPRESS_MIN_SIZE": int(os.getenv("COMPRESS_MIN_SIZE", 1024)),
+        # JSON log file rotated every LOG_MAX_BYTES bytes, and the share of the
+        # requests whose INFO lines are logged (warnings and errors always are)
+        "LOG_FILE": os.getenv("LOG_FILE", "app.log"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
+        "LOG_MAX_BYTES": int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        "LOG_BACKUP_COUNT": int(os.getenv("LOG_BACKUP_COUNT", 5)),
+        "LOG_INFO_SAMPLE_RATE": float(os.getenv("LOG_INFO_SAMPLE_RATE", 1.0)),
+        # requests making more SQL queries are logged as warnings (N+1 queries)
+        "METRICS_QUERY_WARNING": int(os.getenv("METRICS_QUERY_WARNING", 20)),
+        # when set, the cProfile stats of requests slower than this are written to PROFILE_DIR
+        "PROFILE_SLOW_REQUESTS_MS": int(os.getenv("PROFILE_SLOW_REQUESTS_MS", 0)),
+        "PROFILE_DIR": os.getenv("PROFILE_DIR", "profiles"),
+        # most values returned per facet by GET /movie/facets
+        "FACET_LIMIT": int(os.getenv("FACET_LIMIT", 100)),
+        # number of rows written per transaction by the bulk import
+        "IMPORT_BATCH_SIZE": int(os.getenv("IMPORT_BATCH_SIZE", 1000)),
+        # most movies a batch update or delete can list or select by filter
+        "BATCH_MAX_IDS": int(os.getenv("BATCH_MAX_IDS", 10000)),
+        # bcrypt cost, existing hashes are upgraded on the next login when it changes
+        "BCRYPT_ROUNDS": int(os.getenv("BCRYPT_ROUNDS", 12)),
+        # number of threads hashing passwords and seconds a hash may wait for one
+        "HASHING_WORKERS": int(os.getenv("HASHING_WORKERS", os.cpu_count() or 1)),
+        "HASHING_TIMEOUT": int(os.getenv("HASHING_TIMEOUT", 30)),
+        # hashes that may wait for a thread, the next ones are refused at once
+        "HASHING_QUEUE_SIZE": int(os.getenv("HASHING_QUEUE_SIZE", 32)),
+        # signed access tokens returned by /user/login, signed with SECRET_KEY when unset
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY"),
+        "JWT_ACCESS_TOKEN_EXPIRES": timedelta(seconds=int(os.getenv("TOKEN_EXPIRE_TIME", 3600))),
+    }
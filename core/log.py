@@ -0,0 +1,130 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, request
+
+# correlation id of the request being handled and whether its INFO lines are kept
+request_id = ContextVar("request_id", default=None)
+request_sampled = ContextVar("request_sampled", default=True)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per record, with the correlation id of the request
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Queue the records of the request thread without formatting them.
+
+    The correlation id is attached here, the message is only formatted by the
+    listener thread. INFO and lower records of unsampled requests are dropped.
+    """
+
+    def emit(self, record):
+        if record.levelno < logging.WARNING and not request_sampled.get():
+            return
+        record.request_id = request_id.get()
+        super().emit(record)
+
+    def prepare(self, record):
+        return record
+
+
+def start_request(header_id: str, sample_rate: float):
+    """
+    Set the correlation id, from the X-Request-ID header or a new one, and
+    draw whether the request is sampled. Returns the reset tokens.
+    """
+    return (
+        request_id.set(header_id[:64] if header_id else uuid.uuid4().hex),
+        request_sampled.set(random.random() < sample_rate),
+    )
+
+
+def end_request(tokens):
+    request_id.reset(tokens[0])
+    request_sampled.reset(tokens[1])
+
+
+# the queue handler of the root logger and its listener thread, shared by
+# every app created in the process
+_listener = None
+
+
+def _start_listener(app) -> QueueListener:
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handler = RotatingFileHandler(
+        app.config["LOG_FILE"],
+        maxBytes=app.config["LOG_MAX_BYTES"],
+        backupCount=app.config["LOG_BACKUP_COUNT"],
+    )
+    handler.setFormatter(JSONFormatter())
+
+    records = queue.SimpleQueue()
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    # write the queued records before exiting
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(app.config["LOG_LEVEL"])
+    root.addHandler(RequestQueueHandler(records))
+    return _listener
+
+
+def init_logging(app):
+    """
+    Log to a size-rotated JSON file through a queue.
+
+    The request threads only put records on the queue, a listener thread
+    formats and writes them. Every request gets a correlation id, returned
+    in the X-Request-ID header, and only LOG_INFO_SAMPLE_RATE of the
+    requests log their INFO lines (warnings and errors are always logged).
+    The root handler and the listener are installed once per process, by
+    the first app, so later apps do not write every record again.
+    """
+    listener = _start_listener(app)
+
+    @app.before_request
+    def set_request_id():
+        g.log_tokens = start_request(
+            request.headers.get("X-Request-ID"), app.config["LOG_INFO_SAMPLE_RATE"]
+        )
+
+    @app.after_request
+    def add_request_id(response):
+        if request_id.get():
+            response.headers["X-Request-ID"] = request_id.get()
+        return response
+
+    @app.teardown_request
+    def reset_request_id(exception):
+        tokens = g.pop("log_tokens", None)
+        if tokens is not None:
+            end_request(tokens)
+
+    app.extensions["log_listener"] = listener
+    return listener
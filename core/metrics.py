@@ -0,0 +1,266 @@
+import cProfile
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in values
+    )
+    return "{" + ",".join('{}="{}"'.format(name, value) for name, value in zip(names, escaped)) + "}"
+
+
+class Counter:
+    """
+    Monotonic counter per label values
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for label_values, value in sorted(values.items()):
+            yield self.name + _labels(self.labels, label_values), value
+
+
+class Histogram:
+    """
+    Cumulative histogram per label values
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket..., sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self.lock:
+            counts = self.values.get(label_values)
+            if counts is None:
+                counts = self.values[label_values] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        with self.lock:
+            values = {key: list(counts) for key, counts in self.values.items()}
+        names = self.labels + ("le",)
+        for label_values, counts in sorted(values.items()):
+            for bound, count in zip(self.buckets + ("+Inf",), counts[:-2] + [counts[-1]]):
+                yield self.name + "_bucket" + _labels(names, label_values + (bound,)), count
+            yield self.name + "_sum" + _labels(self.labels, label_values), counts[-2]
+            yield self.name + "_count" + _labels(self.labels, label_values), counts[-1]
+
+
+class Gauge:
+    """
+    Value read from the application when /metrics is scraped, type is
+    "counter" for counters kept elsewhere (e.g. the cache hits)
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple = (), collect=None, type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+        self.type = type
+
+    def samples(self):
+        for label_values, value in sorted(self.collect().items()):
+            yield self.name + _labels(self.labels, label_values), value
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency", ("endpoint", "method")
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests by status", ("endpoint", "method", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries made by a request",
+    ("endpoint", "method"),
+    QUERY_COUNT_BUCKETS,
+)
+QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL query latency")
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled connection", ("bind",)
+)
+HASHING_SECONDS = Histogram(
+    "password_hashing_seconds", "bcrypt time, including the wait for a hashing thread"
+)
+
+
+def render(metrics: list) -> str:
+    """
+    The metrics in the Prometheus text exposition format
+    """
+    lines = []
+    for metric in metrics:
+        lines.append("# HELP {} {}".format(metric.name, metric.help))
+        lines.append("# TYPE {} {}".format(metric.name, metric.type))
+        for sample, value in metric.samples():
+            lines.append("{} {}".format(sample, value))
+    return "\n".join(lines) + "\n"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    QUERY_SECONDS.observe(time.perf_counter() - conn.info["query_start"].pop())
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+
+
+def _time_checkout(engine, bind: str):
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, bind)
+
+    engine.raw_connection = timed_raw_connection
+
+
+def _pool_stats(app) -> dict:
+    stats = {}
+    with app.app_context():
+        engines = app.extensions["sqlalchemy"].engines
+    for bind, engine in engines.items():
+        pool = engine.pool
+        for stat in ["size", "checkedout", "overflow"]:
+            if hasattr(pool, stat):
+                stats[(bind or "default", stat)] = getattr(pool, stat)()
+    return stats
+
+
+def init_metrics(app):
+    """
+    Record request, query, pool and hashing metrics and serve them at /metrics.
+
+    Requests making more than METRICS_QUERY_WARNING queries are logged, which
+    shows N+1 query patterns. When PROFILE_SLOW_REQUESTS_MS is set, every
+    request is profiled and the cProfile stats of the ones slower than that
+    are written to PROFILE_DIR.
+    """
+    with app.app_context():
+        for bind, engine in app.extensions["sqlalchemy"].engines.items():
+            _time_checkout(engine, bind or "default")
+
+    cache = app.extensions["cache"]
+    metrics = [
+        REQUEST_SECONDS,
+        REQUESTS,
+        REQUEST_QUERIES,
+        QUERY_SECONDS,
+        POOL_CHECKOUT_SECONDS,
+        Gauge(
+            "db_pool_connections",
+            "Pool size, checked out and overflow connections",
+            ("bind", "state"),
+            lambda: _pool_stats(app),
+        ),
+        Gauge(
+            "cache_requests_total",
+            "Response cache lookups",
+            ("result",),
+            lambda: {(result,): value for result, value in cache.stats().items()},
+            type="counter",
+        ),
+        HASHING_SECONDS,
+    ]
+    profile_threshold = app.config["PROFILE_SLOW_REQUESTS_MS"] / 1000
+
+    @app.before_request
+    def start_request_metrics():
+        g.db_queries = 0
+        g.request_start = time.perf_counter()
+        if profile_threshold:
+            g.profiler = cProfile.Profile()
+            try:
+                g.profiler.enable()
+            except ValueError:
+                # another profiler is already active in this thread
+                g.profiler = None
+
+    @app.after_request
+    def record_request_metrics(response):
+        if "request_start" not in g:
+            return response
+        duration = time.perf_counter() - g.request_start
+        endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+        REQUEST_SECONDS.observe(duration, endpoint, request.method)
+        REQUESTS.inc(endpoint, request.method, response.status_code)
+        REQUEST_QUERIES.observe(g.db_queries, endpoint, request.method)
+        if g.db_queries > app.config["METRICS_QUERY_WARNING"]:
+            logger.warning("%s %s made %s queries", request.method, endpoint, g.db_queries)
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            if duration >= profile_threshold:
+                path = os.path.join(
+                    app.config["PROFILE_DIR"],
+                    "{}-{}-{:.0f}ms.prof".format(
+                        int(time.time() * 1000), request.endpoint, duration * 1000
+                    ),
+                )
+                os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+                profiler.dump_stats(path)
+                logger.warning("Slow request %s %s profiled in %s", request.method, endpoint, path)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exception):
+        # the request failed before after_request
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return Response(render(metrics), mimetype="text/plain; version=0.0.4")
+
+    return metrics
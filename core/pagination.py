@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import date
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(data: dict) -> str:
+    """
+    Encode the keyset position of the last returned row into an opaque cursor
+    """
+    raw = json.dumps(data, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _is_number(value, types) -> bool:
+    # bool is an int for isinstance, but never a valid cursor field
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor, raises ValueError if it is
+    malformed or its id and value have the wrong types
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(data, dict) or not _is_number(data.get("id"), int):
+        raise ValueError("Invalid cursor")
+    value = data.get("value", 0)
+    if not (isinstance(value, str) or _is_number(value, (int, float))):
+        raise ValueError("Invalid cursor")
+    return data
+
+
+def keyset_query(query, column, id_column, order_by: str, cursor: str, per_page: int):
+    """
+    Restrict query (a Query or a select) to the page after cursor ordered by
+    (column, id_column).
+
+    Instead of OFFSET the previous position is turned into a WHERE condition so
+    every page costs the same regardless of how deep it is. The page is fetched
+    with one extra row to know whether there is a next one.
+    Raises ValueError if the cursor is invalid.
+    """
+    descending = order_by != "asc"
+
+    if cursor:
+        data = decode_cursor(cursor)
+        if data.get("sort_by") != column.key or data.get("order_by") != order_by:
+            raise ValueError("Cursor does not match the sort parameters")
+        last_id = data["id"]
+        if column is id_column:
+            query = query.filter(id_column < last_id if descending else id_column > last_id)
+        else:
+            last_value = data.get("value")
+            if column.type.python_type is date:
+                try:
+                    last_value = date.fromisoformat(last_value)
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid cursor")
+            elif not _is_number(last_value, (int, float)):
+                raise ValueError("Invalid cursor")
+            if descending:
+                query = query.filter(
+                    or_(column < last_value, and_(column == last_value, id_column < last_id))
+                )
+            else:
+                query = query.filter(
+                    or_(column > last_value, and_(column == last_value, id_column > last_id))
+                )
+
+    if column is id_column:
+        query = query.order_by(id_column.desc() if descending else id_column.asc())
+    elif descending:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+
+    # fetch one extra row to know whether there is a next page
+    return query.limit(per_page + 1)
+
+
+def keyset_page(items: list, column, id_column, order_by: str, per_page: int):
+    """
+    Split the rows fetched by keyset_query into the page items and the next cursor
+    """
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            {
+                "sort_by": column.key,
+                "order_by": order_by,
+                "value": getattr(last, column.key),
+                "id": getattr(last, id_column.key),
+            }
+        )
+    return items, next_cursor
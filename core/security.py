@@ -1,13 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
+from flask import current_app
+
+from core.metrics import HASHING_SECONDS
+
+
+def init_hashing(app):
+    """
+    Create the bounded pool running password hashing off the request thread.
+
+    bcrypt releases the GIL, so at most HASHING_WORKERS cores are spent on
+    hashing however many logins arrive at once, the rest stays free for the
+    other requests. At most HASHING_QUEUE_SIZE more hashes wait for a thread.
+    """
+    workers = app.config["HASHING_WORKERS"]
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+    app.extensions["hashing_executor"] = executor
+    app.extensions["hashing_slots"] = threading.BoundedSemaphore(
+        workers + app.config["HASHING_QUEUE_SIZE"]
+    )
+    return executor
+
+
+def run_hashing(function, *args):
+    """
+    Run a hashing function in the hashing pool and wait for its result.
+
+    Raises TimeoutError at once when the pool and its queue are full, or
+    after HASHING_TIMEOUT seconds, in which case a hash still queued is
+    cancelled so it does not keep the pool busy for nobody.
+    """
+    executor = current_app.extensions["hashing_executor"]
+    slots = current_app.extensions["hashing_slots"]
+    if not slots.acquire(blocking=False):
+        raise TimeoutError("Hashing queue is full")
+
+    start = time.perf_counter()
+    future = executor.submit(function, *args)
+    # the slot is freed when the hash finishes or is cancelled
+    future.add_done_callback(lambda future: slots.release())
+    try:
+        return future.result(timeout=current_app.config["HASHING_TIMEOUT"])
+    except TimeoutError:
+        future.cancel()
+        raise
+    finally:
+        HASHING_SECONDS.observe(time.perf_counter() - start)
+
 
 def get_hashed_password(password:str)->bytes:
     """
-    Hash a password
+    Hash a password with the configured BCRYPT_ROUNDS
     """
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    salt = bcrypt.gensalt(current_app.config["BCRYPT_ROUNDS"])
+    return run_hashing(bcrypt.hashpw, password.encode("utf-8"), salt)
 
 def verify_password(password:bytes, hashed_password:bytes)->bool:
     """
     Verify a password
     """
-    return bcrypt.checkpw(password, hashed_password)
+    return run_hashing(bcrypt.checkpw, password, hashed_password)
+
+def needs_rehash(hashed_password:bytes)->bool:
+    """
+    Check if a hash was made with a different cost than BCRYPT_ROUNDS
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode("utf-8")
+    # bcrypt hashes look like $2b$<rounds>$<salt and hash>
+    rounds = int(hashed_password.split(b"$")[2])
+    return rounds != current_app.config["BCRYPT_ROUNDS"]
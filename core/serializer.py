@@ -0,0 +1,72 @@
+from datetime import date
+from functools import lru_cache
+
+from flask_restx import fields
+
+_DATE = fields.Date()
+
+
+def _iso_date(value):
+    # the column returns dates, anything else goes through the restx field
+    return value.isoformat() if value.__class__ is date else _DATE.format(value)
+
+
+# fast formatters giving the same values as the restx fields, for fields
+# without attribute or default
+_FORMATTERS = {
+    fields.Integer: int,
+    fields.Float: float,
+    fields.String: str,
+    fields.Date: _iso_date,
+}
+
+
+@lru_cache(maxsize=64)
+def _compile(items: tuple):
+    """
+    Generate a function turning a row into the same dict as marshal(row, model).
+
+    Fields with a fast formatter read the attribute and format it inline,
+    the others fall back to the restx field itself.
+    """
+    namespace = {}
+    lines = ["def serialize(row):"]
+    values = []
+    for index, (key, field) in enumerate(items):
+        if isinstance(field, type):
+            field = field()
+        formatter = _FORMATTERS.get(type(field))
+        if formatter is None or field.attribute is not None or field.default is not None:
+            namespace["field_{}".format(index)] = field
+            values.append("{!r}: field_{}.output({!r}, row)".format(key, index, key))
+            continue
+        namespace["format_{}".format(index)] = formatter
+        lines.append("    value_{} = getattr(row, {!r}, None)".format(index, key))
+        values.append(
+            "{!r}: None if value_{} is None else format_{}(value_{})".format(
+                key, index, index, index
+            )
+        )
+    lines.append("    return {" + ", ".join(values) + "}")
+    exec("\n".join(lines), namespace)
+    return namespace["serialize"]
+
+
+def serializer(model: dict):
+    """
+    Compiled row serializer for a restx model (or dict of fields)
+    """
+    return _compile(tuple(model.items()))
+
+
+def serialize(data, model: dict):
+    """
+    Drop-in replacement of flask_restx marshal for movie rows and lists of rows.
+
+    Rows can be ORM objects or SQL result rows, the output is the same plain
+    dict as marshal's, so the JSON response is byte for byte the same.
+    """
+    serialize_row = serializer(model)
+    if isinstance(data, (list, tuple)):
+        return [serialize_row(row) for row in data]
+    return serialize_row(data)
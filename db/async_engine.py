@@ -0,0 +1,31 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# asyncio drivers replacing the driver of SQLALCHEMY_DATABASE_URI
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_uri(uri: str):
+    """
+    Turn a database URI into the same database on its asyncio driver
+    """
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError("No asyncio driver for {}".format(backend))
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_session(app):
+    """
+    Create the asyncio engine for the app database and a factory of its sessions
+    """
+    engine = create_async_engine(
+        async_database_uri(app.config["SQLALCHEMY_DATABASE_URI"]),
+        **app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    )
+    return async_sessionmaker(engine, expire_on_commit=False)
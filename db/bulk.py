@@ -0,0 +1,195 @@
+import csv
+import io
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.serializer import serializer
+from db import db
+from db.models.movie import Movie
+from schemas.movie import movie_data_response, movie_list_adapter
+
+IMPORT_FORMATS = ["ndjson", "csv"]
+EXPORT_FORMATS = ["ndjson", "csv"]
+
+
+def iter_records(stream, format: str):
+    """
+    Lazily read (line number, record) pairs from a binary stream of NDJSON or CSV.
+
+    Records that can not be parsed are yielded as an exception so the caller
+    can report them with the line they came from.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text_stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+
+def validate_records(records: list) -> tuple:
+    """
+    Validate (line number, record) pairs with the MovieData rules in one pass.
+
+    The records are validated as a list by movie_list_adapter; when some are
+    invalid, the others are validated again in a second pass.
+    Returns the (line number, movie data) pairs and the errors per line.
+    """
+    errors = []
+    pending = []
+    for line_number, record in records:
+        if isinstance(record, Exception):
+            errors.append({"line": line_number, "errors": "Invalid record: {}".format(str(record))})
+        elif not isinstance(record, dict):
+            errors.append({"line": line_number, "errors": "Invalid record: expected an object"})
+        else:
+            pending.append((line_number, record))
+
+    try:
+        movies = movie_list_adapter.validate_python([record for _, record in pending])
+    except ValidationError as e:
+        failed = {}
+        for error in e.errors(include_url=False, include_context=False):
+            # loc starts with the index of the record in the list
+            index = error["loc"][0]
+            failed.setdefault(index, []).append(dict(error, loc=error["loc"][1:]))
+        errors.extend(
+            {"line": pending[index][0], "errors": record_errors}
+            for index, record_errors in failed.items()
+        )
+        errors.sort(key=lambda error: error["line"])
+        pending = [item for index, item in enumerate(pending) if index not in failed]
+        movies = movie_list_adapter.validate_python([record for _, record in pending])
+    return [(line_number, movie) for (line_number, _), movie in zip(pending, movies)], errors
+
+
+def import_movies(records, user_id: int, batch_size: int = 1000) -> dict:
+    """
+    Insert movies from (line number, record) pairs in batches of batch_size.
+
+    Each batch is validated in one pass, written with a single executemany
+    INSERT and committed on its own, so memory stays bounded by the batch
+    size and a failing batch does not undo the previous ones.
+    Returns the number of imported rows and the errors per line.
+    """
+    report = {"imported": 0, "failed": 0, "errors": []}
+    batch = []
+
+    def flush():
+        valid, errors = validate_records(batch)
+        batch.clear()
+        report["failed"] += len(errors)
+        report["errors"].extend(errors)
+        if not valid:
+            return
+
+        rows = []
+        for _, movie_data in valid:
+            row = movie_data.model_dump(exclude={"user_id"})
+            row["user_id"] = user_id
+            rows.append(row)
+        try:
+            db.session.execute(insert(Movie), rows)
+            db.session.commit()
+            report["imported"] += len(rows)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            report["failed"] += len(rows)
+            report["errors"].extend(
+                {"line": line_number, "errors": str(e)} for line_number, _ in valid
+            )
+
+    for line_number, record in records:
+        batch.append((line_number, record))
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
+
+
+def export_movies(query, format: str, batch_size: int = 1000, fields: dict = movie_data_response):
+    """
+    Yield the movies of query as NDJSON or CSV text chunks of batch_size rows.
+
+    fields is the marshalling model, movie_data_response or a projection of it.
+
+    The rows are read in id order through a single streamed statement
+    (yield_per), so memory stays constant and the database serves the whole
+    export from one consistent snapshot.
+    """
+    buffer = io.StringIO()
+    writer = None
+    if format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=list(fields.keys()))
+        writer.writeheader()
+
+    serialize = serializer(fields)
+    rows = query.order_by(Movie.id).yield_per(batch_size)
+    for count, movie in enumerate(rows, start=1):
+        row = serialize(movie)
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def batch_movies(query, user_id: int, ids: list = None, changes: dict = None, max_movies: int = None) -> dict:
+    """
+    Update (with changes) or delete the movies of query owned by user_id.
+
+    Ownership is checked with a single query on movies.user_id, then the owned
+    movies are changed with one bulk UPDATE or DELETE, in the same transaction.
+    ids are the requested ids, when the movies are selected by id, so the
+    missing ones can be reported. Returns the changed ids and the skipped ones
+    with the reason.
+
+    Raises ValueError, before changing anything, if query selects more than
+    max_movies movies; at most max_movies + 1 rows are read to find out. A
+    filter selection is expected to be limited to user_id already, so the
+    cap counts the user's movies only.
+    """
+    rows = query.with_entities(Movie.id, Movie.user_id).order_by(Movie.id)
+    if max_movies is not None:
+        rows = rows.limit(max_movies + 1)
+    rows = rows.all()
+    if max_movies is not None and len(rows) > max_movies:
+        raise ValueError("At most {} movies can be changed at once".format(max_movies))
+    owned = [movie_id for movie_id, owner in rows if owner == user_id]
+    skipped = [
+        {"id": movie_id, "reason": "not owned"} for movie_id, owner in rows if owner != user_id
+    ]
+    if ids is not None:
+        found = {movie_id for movie_id, _ in rows}
+        skipped.extend(
+            {"id": movie_id, "reason": "not found"}
+            for movie_id in sorted(set(ids) - found)
+        )
+
+    if owned:
+        owned_query = query.filter(Movie.user_id == user_id)
+        if changes is None:
+            owned_query.delete(synchronize_session=False)
+        else:
+            owned_query.update(changes, synchronize_session=False)
+    db.session.commit()
+    return {"ids": owned, "skipped": skipped}
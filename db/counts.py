@@ -0,0 +1,14 @@
+from db import db
+from db.models.movie import Movie
+from db.models.movie_count import MovieCount
+
+
+def movie_count() -> int:
+    """
+    Number of movies, read from movie_counts instead of scanning the movies table
+    """
+    row = db.session.get(MovieCount, "movies")
+    if row is None:
+        # no trigger support for this database
+        return Movie.query.count()
+    return row.count
@@ -0,0 +1,83 @@
+from sqlalchemy import String, case, cast, extract, func, select
+
+from db import db
+from db.models.movie import Movie
+from db.models.movie_facet import MovieFacet
+
+# facets returned by GET /movie/facets
+FACET_FIELDS = ["genre", "director", "release_year", "rating", "price"]
+# upper bounds of the rating and ticket price buckets
+RATING_BUCKETS = [2, 3, 4, 5, 6, 7, 8, 9]
+PRICE_BUCKETS = [100, 250, 500, 1000, 2500, 5000]
+# dialects whose movie_facets is maintained by triggers
+TRIGGER_DIALECTS = ["sqlite", "postgresql"]
+
+
+def bucket(column, bounds: list, lowest: int, last: str):
+    """
+    Label of the bucket of column, e.g. "100-250", values above the last bound get last
+    """
+    lower = [lowest] + bounds[:-1]
+    return case(
+        *[
+            (column < upper, "{}-{}".format(low, upper))
+            for low, upper in zip(lower, bounds)
+        ],
+        else_=last,
+    )
+
+
+def facet_expressions() -> dict:
+    """
+    SQL expression of the value of every facet of a movie, the triggers of
+    migration 0005 maintain movie_facets with the same expressions
+    """
+    return {
+        "genre": Movie.genre,
+        "director": Movie.director,
+        "release_year": cast(extract("year", Movie.release_date), String),
+        "rating": bucket(Movie.avg_rating, RATING_BUCKETS, 1, "9-10"),
+        "price": bucket(Movie.ticket_price, PRICE_BUCKETS, 0, "{}+".format(PRICE_BUCKETS[-1])),
+    }
+
+
+def facet_counts(query=None, limit: int = 100) -> dict:
+    """
+    Count the movies per value of every facet, the limit most frequent values first.
+
+    Without query the counts are read from movie_facets, in
+    O(distinct values). With query (the movies of a filter) they are counted
+    with GROUP BY over the matching movies. That reads every movie the filter
+    reads, i.e. the whole table for the genre and director substring filters
+    and a release_date index range for the release year ones. Databases
+    without the triggers are always counted with GROUP BY over the table.
+    """
+    facets = {}
+    if query is None and db.session.get_bind().dialect.name in TRIGGER_DIALECTS:
+        for facet in FACET_FIELDS:
+            rows = (
+                db.session.query(MovieFacet.value, MovieFacet.count)
+                .filter(MovieFacet.facet == facet, MovieFacet.count > 0)
+                .order_by(MovieFacet.count.desc(), MovieFacet.value)
+                .limit(limit)
+                .all()
+            )
+            facets[facet] = [{"value": value, "count": count} for value, count in rows]
+        return facets
+
+    criterion = query.whereclause if query is not None else None
+    for facet, expression in facet_expressions().items():
+        count = func.count().label("count")
+        statement = (
+            select(expression.label("value"), count)
+            .select_from(Movie)
+            .where(expression.isnot(None))
+            .group_by(expression)
+            .order_by(count.desc(), expression)
+            .limit(limit)
+        )
+        if criterion is not None:
+            statement = statement.where(criterion)
+        rows = db.session.execute(statement).all()
+        facets[facet] = [{"value": value, "count": count} for value, count in rows]
+    return facets
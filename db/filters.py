@@ -0,0 +1,36 @@
+from datetime import date
+
+from db.models.movie import Movie
+
+# filter_by values accepted by GET /movie and the export
+FILTER_FIELDS = ["genre", "director", "release_year"]
+
+
+def parse_year(value: str) -> int:
+    """
+    Parse a release year query parameter, raises ValueError if it is not a valid year
+    """
+    if not value.isdigit() or not 1 <= int(value) < date.max.year:
+        raise ValueError("Invalid release year {}".format(value))
+    return int(value)
+
+
+def filter_movies(query, filter_by: str, filter_value: str, release_year_from: str = "", release_year_to: str = ""):
+    """
+    Apply the filter_by and release year parameters to a movie query.
+
+    Release years are turned into release_date ranges so the release_date
+    index can be used. Raises ValueError if a release year is invalid.
+    """
+    if filter_by == "release_year":
+        release_year_from = release_year_to = filter_value
+    year_from = parse_year(release_year_from) if release_year_from else None
+    year_to = parse_year(release_year_to) if release_year_to else None
+
+    if filter_by in ["genre", "director"]:
+        query = query.filter(getattr(Movie, filter_by).like("%" + filter_value + "%"))
+    if year_from is not None:
+        query = query.filter(Movie.release_date >= date(year_from, 1, 1))
+    if year_to is not None:
+        query = query.filter(Movie.release_date < date(year_to + 1, 1, 1))
+    return query
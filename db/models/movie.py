@@ -1,6 +1,14 @@
+from datetime import datetime, timezone
 from db import db
 
 
+def utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime, the way it is stored in the database
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Movie(db.Model):
     """
     Movie model with the following attributes:
@@ -13,9 +21,17 @@ class Movie(db.Model):
     - avg_rating: movie average rating
     - ticket_price: movie ticket price
     - cast: movie cast
+    - updated_at: time of the last change, used for ETag and Last-Modified
     """
 
     __tablename__ = "movies"
+    # indexes for the sort_by values allowed by GET /movie, id is the tie
+    # breaker used by cursor pagination. genre and director are filtered by
+    # substring (LIKE '%value%'), which no b-tree index can serve
+    __table_args__ = (
+        db.Index("ix_movies_release_date_id", "release_date", "id"),
+        db.Index("ix_movies_ticket_price_id", "ticket_price", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String)
@@ -27,7 +43,10 @@ class Movie(db.Model):
     avg_rating = db.Column(db.Float)
     ticket_price = db.Column(db.Float)
     cast = db.Column(db.String)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
     # user_id is a foreign key
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
 
     created_by = db.relationship("User", backref="movies")
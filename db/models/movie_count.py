@@ -0,0 +1,14 @@
+from db import db
+
+
+class MovieCount(db.Model):
+    """
+    Row counts maintained by database triggers with the following attributes:
+    - name: what is counted, "movies" for the whole catalog
+    - count: number of rows
+    """
+
+    __tablename__ = "movie_counts"
+
+    name = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
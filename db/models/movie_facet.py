@@ -0,0 +1,17 @@
+from db import db
+
+
+class MovieFacet(db.Model):
+    """
+    Number of movies per facet value, maintained by database triggers, with
+    the following attributes:
+    - facet: "genre", "director", "release_year", "rating" or "price"
+    - value: the genre, director, year or bucket
+    - count: number of movies
+    """
+
+    __tablename__ = "movie_facets"
+
+    facet = db.Column(db.String, primary_key=True)
+    value = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
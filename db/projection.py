@@ -0,0 +1,43 @@
+from sqlalchemy.orm import load_only
+
+from db.models.movie import Movie
+from schemas.movie import movie_data_response
+
+
+def parse_fields(value: str) -> list:
+    """
+    Parse the comma separated fields query parameter of the movie GET routes.
+
+    Returns the requested movie_data_response fields in response order, or
+    None when every field is requested. Raises ValueError for an unknown field.
+    """
+    if not value:
+        return None
+    requested = set(value.split(","))
+    if not requested.issubset(movie_data_response.keys()):
+        raise ValueError("Invalid fields parameter")
+    return [name for name in movie_data_response.keys() if name in requested]
+
+
+def project(query, field_names: list, *columns):
+    """
+    Only load the columns of the requested fields from the database.
+
+    id and updated_at are always loaded for the ETag, as well as the extra
+    columns needed to build the page (e.g. the cursor sort column).
+    """
+    if field_names is None:
+        return query
+    names = {"id", "updated_at"}
+    names.update(column.key for column in columns)
+    names.update(name for name in field_names if name in Movie.__table__.columns)
+    return query.options(load_only(*[getattr(Movie, name) for name in sorted(names)]))
+
+
+def response_fields(field_names: list) -> dict:
+    """
+    The movie_data_response fields to marshal, restricted to field_names
+    """
+    if field_names is None:
+        return movie_data_response
+    return {name: movie_data_response[name] for name in field_names}
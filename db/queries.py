@@ -0,0 +1,197 @@
+from flask import current_app
+
+from core.pagination import keyset_page, keyset_query
+from db.filters import FILTER_FIELDS, filter_movies
+from db.models.movie import Movie
+from db.projection import parse_fields, project, response_fields
+from db.search import SEARCH_FIELDS, search_movies
+
+# sort_by values accepted by GET /movie
+SORT_FIELDS = ["release_date", "ticket_price"]
+
+
+def pagination_args(args, cursor: str, row_budget: int) -> tuple:
+    """
+    Validate the page and movies_per_page query parameters, returns them.
+
+    movies_per_page must be within the configured page sizes, and in page
+    mode the rows the database reads to reach the page (offset + limit) must
+    fit in the row budget of the route. Raises ValueError with the message
+    for the client.
+    """
+    config = current_app.config
+    page = args.get("page", 1, type=int)
+    movies_per_page = args.get(
+        "movies_per_page", config["MOVIES_PER_PAGE_DEFAULT"], type=int
+    )
+
+    # page can only integer greater than 0
+    if page < 1:
+        raise ValueError("Invalid page number")
+
+    if not config["MOVIES_PER_PAGE_MIN"] <= movies_per_page <= config["MOVIES_PER_PAGE_MAX"]:
+        raise ValueError(
+            "Invalid movies_per_page parameter, it must be between {} and {}".format(
+                config["MOVIES_PER_PAGE_MIN"], config["MOVIES_PER_PAGE_MAX"]
+            )
+        )
+
+    if cursor is None and page * movies_per_page > row_budget:
+        raise ValueError("Page number too large, use cursor pagination")
+    return page, movies_per_page
+
+
+def movie_list_query(args) -> dict:
+    """
+    Validate the GET /movie query parameters and build the (unexecuted) query.
+
+    args is a werkzeug MultiDict. The query, the pagination parameters and
+    whether the page number has to be checked against the movie count are
+    returned so the sync and async views can execute it their own way.
+    Raises ValueError with the message for the client.
+    """
+    sort_by = args.get("sort_by", "none", type=str)
+    order_by = args.get("order_by", "asc", type=str)
+    filter_by = args.get("filter_by", "none", type=str)
+    filter_value = args.get("filter_value", "", type=str)
+    release_year_from = args.get("release_year_from", "", type=str)
+    release_year_to = args.get("release_year_to", "", type=str)
+    # an empty cursor starts cursor mode from the first row
+    cursor = args.get("cursor", None, type=str)
+    field_names = parse_fields(args.get("fields", "", type=str))
+
+    # sort_by can only be "release_data" or "ticket_price"
+    if sort_by not in SORT_FIELDS + ["none"]:
+        raise ValueError("Invalid sort_by parameter")
+
+    page, movies_per_page = pagination_args(
+        args, cursor, current_app.config["MOVIE_LIST_ROW_BUDGET"]
+    )
+
+    # filter_by can only be "genre", "director" or "release_year"
+    if filter_by not in FILTER_FIELDS + ["none"]:
+        raise ValueError("Invalid filter_by parameter")
+
+    # build the query from the filter_by and sort_by parameters
+    try:
+        query = filter_movies(
+            Movie.query, filter_by, filter_value, release_year_from, release_year_to
+        )
+    except ValueError:
+        raise ValueError("Invalid release year")
+
+    sort_column = Movie.id if sort_by == "none" else getattr(Movie, sort_by)
+    # only select the columns of the requested fields
+    query = project(query, field_names, sort_column)
+    if cursor is not None:
+        # cursor mode: keyset pagination keyed on the sort column and id
+        try:
+            query = keyset_query(
+                query, sort_column, Movie.id, order_by, cursor, movies_per_page
+            )
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    else:
+        if sort_by != "none":
+            if order_by == "asc":
+                query = query.order_by(sort_column.asc())
+            else:
+                query = query.order_by(sort_column.desc())
+        # one extra row tells whether there is a next page
+        query = query.limit(movies_per_page + 1).offset((page - 1) * movies_per_page)
+
+    return {
+        "query": query,
+        "page": page,
+        "movies_per_page": movies_per_page,
+        "sort_column": sort_column,
+        "order_by": order_by,
+        "cursor": cursor,
+        "fields": response_fields(field_names),
+        # the unfiltered page number is checked against the movie count
+        "check_page": cursor is None
+        and sort_by == "none"
+        and filter_by == "none"
+        and not release_year_from
+        and not release_year_to,
+    }
+
+
+def movie_search_query(args) -> dict:
+    """
+    Validate the GET /movie/search query parameters and build the (unexecuted) query.
+
+    Raises ValueError with the message for the client.
+    """
+    search_param = args.get("search_param", "", type=str)
+    search_value = args.get("search_value", "", type=str)
+    cursor = args.get("cursor", None, type=str)
+    field_names = parse_fields(args.get("fields", "", type=str))
+
+    page, movies_per_page = pagination_args(
+        args, cursor, current_app.config["MOVIE_SEARCH_ROW_BUDGET"]
+    )
+
+    # search_param is "all" or a comma separated list of
+    # "title", "genre", "description", "director" or "cast"
+    if search_param == "all":
+        search_fields = SEARCH_FIELDS
+    else:
+        search_fields = search_param.split(",")
+    if not all(field in SEARCH_FIELDS for field in search_fields):
+        raise ValueError("Invalid search parameter")
+
+    # search the full-text index for movies that match the search criteria
+    query, rank = search_movies(search_fields, search_value)
+    query = project(query, field_names)
+
+    if cursor is not None:
+        try:
+            query = keyset_query(query, Movie.id, Movie.id, "asc", cursor, movies_per_page)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    else:
+        # best matches first
+        query = (
+            query.order_by(rank, Movie.id)
+            .limit(movies_per_page + 1)
+            .offset((page - 1) * movies_per_page)
+        )
+
+    return {
+        "query": query,
+        "movies_per_page": movies_per_page,
+        "sort_column": Movie.id,
+        "order_by": "asc",
+        "cursor": cursor,
+        "fields": response_fields(field_names),
+    }
+
+
+def split_page(movies: list, listing: dict, total: int = None):
+    """
+    Drop the extra row fetched by the list and search queries.
+
+    Returns the page and its pagination headers: X-Has-Next, X-Next-Cursor in
+    cursor mode and X-Total-Count when the total is known.
+    """
+    headers = {}
+    if listing["cursor"] is not None:
+        movies, next_cursor = keyset_page(
+            movies,
+            listing["sort_column"],
+            Movie.id,
+            listing["order_by"],
+            listing["movies_per_page"],
+        )
+        has_next = next_cursor is not None
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+    else:
+        has_next = len(movies) > listing["movies_per_page"]
+        movies = movies[: listing["movies_per_page"]]
+
+    headers["X-Has-Next"] = "true" if has_next else "false"
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return movies, headers
@@ -0,0 +1,67 @@
+import random
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+
+# bind keys of the read replicas start with this prefix
+REPLICA_PREFIX = "replica"
+STICKY_COOKIE = "read_primary_until"
+
+
+class RoutingSession(Session):
+    """
+    Session sending the SELECTs of read_replica views to a random read replica
+    and everything else to the primary
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or (clause is not None and not isinstance(clause, Select)):
+                # remembered so the client reads its own writes from the primary
+                g.wrote_primary = True
+            elif g.get("read_replica") and not g.get("wrote_primary"):
+                replicas = [
+                    engine
+                    for key, engine in self._db.engines.items()
+                    if key and key.startswith(REPLICA_PREFIX)
+                ]
+                if replicas:
+                    return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(f):
+    """
+    Run the queries of a view on a read replica, unless the client wrote
+    less than REPLICA_STICKY_SECONDS ago
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        primary_until = request.cookies.get(STICKY_COOKIE, 0, type=float)
+        g.read_replica = primary_until < time.time()
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def init_replicas(app):
+    """
+    Give the clients that wrote to the primary a cookie sending their reads to
+    the primary for REPLICA_STICKY_SECONDS
+    """
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get("wrote_primary"):
+            sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+            )
+        return response
@@ -0,0 +1,142 @@
+import regex as re
+from sqlalchemy import Float, Integer, func, literal_column, or_, text
+
+from db import db
+from db.models.movie import Movie
+
+# fields of the movie table that are covered by the full-text index
+SEARCH_FIELDS = ["title", "genre", "description", "director", "cast"]
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def search_backend() -> str:
+    """
+    Name of the full-text backend for the configured database dialect
+    """
+    dialect = db.engine.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        return dialect
+    return "like"
+
+
+def search_index_statements(dialect: str) -> list:
+    """
+    DDL statements creating the full-text index for the movies table.
+
+    SQLite uses an external content FTS5 table kept in sync by triggers,
+    Postgres uses a generated tsvector column with a GIN index, so every
+    write to movies updates the index in the same transaction.
+    """
+    if dialect == "sqlite":
+        return [
+            """CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+                title, genre, description, director, "cast",
+                content='movies', content_rowid='id')""",
+            """CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+                INSERT INTO movies_fts(rowid, title, genre, description, director, "cast")
+                VALUES (new.id, new.title, new.genre, new.description, new.director, new."cast");
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+                INSERT INTO movies_fts(movies_fts, rowid, title, genre, description, director, "cast")
+                VALUES ('delete', old.id, old.title, old.genre, old.description, old.director, old."cast");
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE ON movies BEGIN
+                INSERT INTO movies_fts(movies_fts, rowid, title, genre, description, director, "cast")
+                VALUES ('delete', old.id, old.title, old.genre, old.description, old.director, old."cast");
+                INSERT INTO movies_fts(rowid, title, genre, description, director, "cast")
+                VALUES (new.id, new.title, new.genre, new.description, new.director, new."cast");
+            END""",
+        ]
+    if dialect == "postgresql":
+        return [
+            """ALTER TABLE movies ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple',
+                    coalesce(title, '') || ' ' || coalesce(genre, '') || ' ' ||
+                    coalesce(description, '') || ' ' || coalesce(director, '') || ' ' ||
+                    coalesce("cast", ''))) STORED""",
+            "CREATE INDEX IF NOT EXISTS ix_movies_search_vector ON movies USING GIN (search_vector)",
+        ]
+    return []
+
+
+def setup_search_index():
+    """
+    Create the full-text index for the movies table if it does not exist
+    """
+    for statement in search_index_statements(db.engine.dialect.name):
+        db.session.execute(text(statement))
+    db.session.commit()
+
+
+def rebuild_search_index():
+    """
+    Rebuild the full-text index from the movies table
+    """
+    setup_search_index()
+    backend = search_backend()
+    if backend == "sqlite":
+        db.session.execute(text("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')"))
+    elif backend == "postgresql":
+        db.session.execute(text("REINDEX INDEX ix_movies_search_vector"))
+    db.session.commit()
+
+
+def search_movies(fields: list, value: str):
+    """
+    Build a query for movies matching every word of value in any of fields.
+
+    Returns the query and the ordering clause that ranks the best matches first.
+    Raises ValueError if value contains no searchable words.
+    """
+    tokens = TOKEN_RE.findall(value)
+    if not tokens:
+        raise ValueError("Invalid search value")
+
+    backend = search_backend()
+    if backend == "sqlite":
+        # every token is quoted so user input can not inject FTS5 query syntax
+        terms = " ".join('"{}"*'.format(token) for token in tokens)
+        match = "{{{}}} : ({})".format(" ".join(fields), terms)
+        matches = (
+            text("SELECT rowid, rank FROM movies_fts WHERE movies_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(rowid=Integer, rank=Float)
+            .subquery()
+        )
+        query = Movie.query.join(matches, matches.c.rowid == Movie.id)
+        # bm25 rank is negative, lower means more relevant
+        return query, matches.c.rank.asc()
+
+    if backend == "postgresql":
+        ts_query = func.to_tsquery(
+            "simple", " & ".join("{}:*".format(token) for token in tokens)
+        )
+        vector = literal_column("movies.search_vector")
+        query = Movie.query.filter(vector.op("@@")(ts_query))
+        if set(fields) != set(SEARCH_FIELDS):
+            query = query.filter(
+                or_(
+                    *[
+                        func.to_tsvector("simple", func.coalesce(getattr(Movie, field), "")).op("@@")(ts_query)
+                        for field in fields
+                    ]
+                )
+            )
+        return query, func.ts_rank(vector, ts_query).desc()
+
+    # no full-text support, fall back to a substring scan
+    query = Movie.query.filter(
+        or_(*[getattr(Movie, field).like("%{}%".format(value)) for field in fields])
+    )
+    return query, Movie.id.asc()
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Keep the full-text index objects, which are not declared on the models,
+    out of alembic autogenerate
+    """
+    if reflected and compare_to is None:
+        return not (name.startswith("movies_fts") or name.endswith("search_vector"))
+    return True
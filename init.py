@@ -1,17 +1,75 @@
+import os
 from flask import Flask
-from db import db
 
-# from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager
 # from flask_marshmallow import Marshmallow
 from flask_login import LoginManager
-from core.config import AppConfig
 
 
-app = Flask(__name__)
-app.config.from_object(AppConfig)
-
-login_manager = LoginManager(app)
+login_manager = LoginManager()
 # login_manager.login_view = "user.login"
-db.init_app(app)
-# jwt = JWTManager(app)
+jwt = JWTManager()
 # ma = Marshmallow(app)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    from db.models.user import User
+
+    return User.query.filter_by(id=user_id).first()
+
+
+def init_migrate(app):
+    """
+    Register Flask-Migrate, which imports alembic, only called by the
+    database commands so the workers do not load it
+    """
+    if "migrate" in app.extensions:
+        return
+    from flask_migrate import Migrate
+    from db import db
+    from db.search import include_object
+
+    Migrate(
+        app,
+        db,
+        directory=os.path.join(os.path.dirname(__file__), "migrations"),
+        include_object=include_object,
+    )
+
+
+def create_app(config: dict = None):
+    """
+    Build the app from the environment configuration, with config overriding it.
+
+    Nothing is built or imported beyond Flask when this module is imported,
+    and the database commands import alembic only when they run.
+    """
+    from commands import init_commands
+    from core.cache import init_cache
+    from core.compression import init_compression
+    from core.config import load_config
+    from core.log import init_logging
+    from core.metrics import init_metrics
+    from core.security import init_hashing
+    from db import db
+    from db.routing import init_replicas
+    from routes.base import api
+
+    app = Flask(__name__)
+    app.config.from_mapping(load_config())
+    if config:
+        app.config.from_mapping(config)
+    init_logging(app)
+
+    login_manager.init_app(app)
+    db.init_app(app)
+    init_replicas(app)
+    init_cache(app)
+    init_compression(app)
+    init_hashing(app)
+    init_metrics(app)
+    jwt.init_app(app)
+    api.init_app(app)
+    init_commands(app)
+    return app
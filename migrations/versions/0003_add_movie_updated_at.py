@@ -0,0 +1,27 @@
+"""add movie updated_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:35:22.623946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # plain ALTER TABLE instead of a batch table copy, which would drop the
+    # full-text triggers on SQLite
+    op.add_column('movies', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE movies SET updated_at = CURRENT_TIMESTAMP')
+
+
+def downgrade():
+    op.drop_column('movies', 'updated_at')
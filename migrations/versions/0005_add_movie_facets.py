@@ -0,0 +1,335 @@
+"""add movie facets
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:11.065739
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# the facet expressions of db/facets.py as of this revision, changing them
+# takes a new revision replacing the triggers and reseeding the counts
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS movie_facets_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'genre', value, 1
+            FROM (SELECT NEW.genre AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'director', value, 1
+            FROM (SELECT NEW.director AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'release_year', value, 1
+            FROM (SELECT CAST(CAST(STRFTIME('%Y', NEW.release_date) AS INTEGER) AS VARCHAR) AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'rating', value, 1
+            FROM (SELECT CASE
+                WHEN NEW.avg_rating < 2 THEN '1-2'
+                WHEN NEW.avg_rating < 3 THEN '2-3'
+                WHEN NEW.avg_rating < 4 THEN '3-4'
+                WHEN NEW.avg_rating < 5 THEN '4-5'
+                WHEN NEW.avg_rating < 6 THEN '5-6'
+                WHEN NEW.avg_rating < 7 THEN '6-7'
+                WHEN NEW.avg_rating < 8 THEN '7-8'
+                WHEN NEW.avg_rating < 9 THEN '8-9'
+                ELSE '9-10'
+            END AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'price', value, 1
+            FROM (SELECT CASE
+                WHEN NEW.ticket_price < 100 THEN '0-100'
+                WHEN NEW.ticket_price < 250 THEN '100-250'
+                WHEN NEW.ticket_price < 500 THEN '250-500'
+                WHEN NEW.ticket_price < 1000 THEN '500-1000'
+                WHEN NEW.ticket_price < 2500 THEN '1000-2500'
+                WHEN NEW.ticket_price < 5000 THEN '2500-5000'
+                ELSE '5000+'
+            END AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_facets_delete AFTER DELETE ON movies BEGIN
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'genre' AND value = OLD.genre;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'director' AND value = OLD.director;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'release_year' AND value = CAST(CAST(STRFTIME('%Y', OLD.release_date) AS INTEGER) AS VARCHAR);
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'rating' AND value = CASE
+                WHEN OLD.avg_rating < 2 THEN '1-2'
+                WHEN OLD.avg_rating < 3 THEN '2-3'
+                WHEN OLD.avg_rating < 4 THEN '3-4'
+                WHEN OLD.avg_rating < 5 THEN '4-5'
+                WHEN OLD.avg_rating < 6 THEN '5-6'
+                WHEN OLD.avg_rating < 7 THEN '6-7'
+                WHEN OLD.avg_rating < 8 THEN '7-8'
+                WHEN OLD.avg_rating < 9 THEN '8-9'
+                ELSE '9-10'
+            END;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'price' AND value = CASE
+                WHEN OLD.ticket_price < 100 THEN '0-100'
+                WHEN OLD.ticket_price < 250 THEN '100-250'
+                WHEN OLD.ticket_price < 500 THEN '250-500'
+                WHEN OLD.ticket_price < 1000 THEN '500-1000'
+                WHEN OLD.ticket_price < 2500 THEN '1000-2500'
+                WHEN OLD.ticket_price < 5000 THEN '2500-5000'
+                ELSE '5000+'
+            END;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_facets_update
+    AFTER UPDATE OF genre, director, release_date, avg_rating, ticket_price ON movies BEGIN
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'genre' AND value = OLD.genre;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'director' AND value = OLD.director;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'release_year' AND value = CAST(CAST(STRFTIME('%Y', OLD.release_date) AS INTEGER) AS VARCHAR);
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'rating' AND value = CASE
+                WHEN OLD.avg_rating < 2 THEN '1-2'
+                WHEN OLD.avg_rating < 3 THEN '2-3'
+                WHEN OLD.avg_rating < 4 THEN '3-4'
+                WHEN OLD.avg_rating < 5 THEN '4-5'
+                WHEN OLD.avg_rating < 6 THEN '5-6'
+                WHEN OLD.avg_rating < 7 THEN '6-7'
+                WHEN OLD.avg_rating < 8 THEN '7-8'
+                WHEN OLD.avg_rating < 9 THEN '8-9'
+                ELSE '9-10'
+            END;
+        UPDATE movie_facets SET count = count - 1
+            WHERE facet = 'price' AND value = CASE
+                WHEN OLD.ticket_price < 100 THEN '0-100'
+                WHEN OLD.ticket_price < 250 THEN '100-250'
+                WHEN OLD.ticket_price < 500 THEN '250-500'
+                WHEN OLD.ticket_price < 1000 THEN '500-1000'
+                WHEN OLD.ticket_price < 2500 THEN '1000-2500'
+                WHEN OLD.ticket_price < 5000 THEN '2500-5000'
+                ELSE '5000+'
+            END;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'genre', value, 1
+            FROM (SELECT NEW.genre AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'director', value, 1
+            FROM (SELECT NEW.director AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'release_year', value, 1
+            FROM (SELECT CAST(CAST(STRFTIME('%Y', NEW.release_date) AS INTEGER) AS VARCHAR) AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'rating', value, 1
+            FROM (SELECT CASE
+                WHEN NEW.avg_rating < 2 THEN '1-2'
+                WHEN NEW.avg_rating < 3 THEN '2-3'
+                WHEN NEW.avg_rating < 4 THEN '3-4'
+                WHEN NEW.avg_rating < 5 THEN '4-5'
+                WHEN NEW.avg_rating < 6 THEN '5-6'
+                WHEN NEW.avg_rating < 7 THEN '6-7'
+                WHEN NEW.avg_rating < 8 THEN '7-8'
+                WHEN NEW.avg_rating < 9 THEN '8-9'
+                ELSE '9-10'
+            END AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        INSERT INTO movie_facets (facet, value, count)
+            SELECT 'price', value, 1
+            FROM (SELECT CASE
+                WHEN NEW.ticket_price < 100 THEN '0-100'
+                WHEN NEW.ticket_price < 250 THEN '100-250'
+                WHEN NEW.ticket_price < 500 THEN '250-500'
+                WHEN NEW.ticket_price < 1000 THEN '500-1000'
+                WHEN NEW.ticket_price < 2500 THEN '1000-2500'
+                WHEN NEW.ticket_price < 5000 THEN '2500-5000'
+                ELSE '5000+'
+            END AS value) AS row_value
+            WHERE value IS NOT NULL
+            ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+    END""",
+]
+
+POSTGRESQL_TRIGGERS = [
+    """CREATE OR REPLACE FUNCTION movie_facets_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE movie_facets SET count = count - 1
+                WHERE facet = 'genre' AND value = OLD.genre;
+            UPDATE movie_facets SET count = count - 1
+                WHERE facet = 'director' AND value = OLD.director;
+            UPDATE movie_facets SET count = count - 1
+                WHERE facet = 'release_year' AND value = CAST(EXTRACT(year FROM OLD.release_date) AS VARCHAR);
+            UPDATE movie_facets SET count = count - 1
+                WHERE facet = 'rating' AND value = CASE
+                    WHEN OLD.avg_rating < 2 THEN '1-2'
+                    WHEN OLD.avg_rating < 3 THEN '2-3'
+                    WHEN OLD.avg_rating < 4 THEN '3-4'
+                    WHEN OLD.avg_rating < 5 THEN '4-5'
+                    WHEN OLD.avg_rating < 6 THEN '5-6'
+                    WHEN OLD.avg_rating < 7 THEN '6-7'
+                    WHEN OLD.avg_rating < 8 THEN '7-8'
+                    WHEN OLD.avg_rating < 9 THEN '8-9'
+                    ELSE '9-10'
+                END;
+            UPDATE movie_facets SET count = count - 1
+                WHERE facet = 'price' AND value = CASE
+                    WHEN OLD.ticket_price < 100 THEN '0-100'
+                    WHEN OLD.ticket_price < 250 THEN '100-250'
+                    WHEN OLD.ticket_price < 500 THEN '250-500'
+                    WHEN OLD.ticket_price < 1000 THEN '500-1000'
+                    WHEN OLD.ticket_price < 2500 THEN '1000-2500'
+                    WHEN OLD.ticket_price < 5000 THEN '2500-5000'
+                    ELSE '5000+'
+                END;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO movie_facets (facet, value, count)
+                SELECT 'genre', value, 1
+                FROM (SELECT NEW.genre AS value) AS row_value
+                WHERE value IS NOT NULL
+                ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+            INSERT INTO movie_facets (facet, value, count)
+                SELECT 'director', value, 1
+                FROM (SELECT NEW.director AS value) AS row_value
+                WHERE value IS NOT NULL
+                ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+            INSERT INTO movie_facets (facet, value, count)
+                SELECT 'release_year', value, 1
+                FROM (SELECT CAST(EXTRACT(year FROM NEW.release_date) AS VARCHAR) AS value) AS row_value
+                WHERE value IS NOT NULL
+                ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+            INSERT INTO movie_facets (facet, value, count)
+                SELECT 'rating', value, 1
+                FROM (SELECT CASE
+                    WHEN NEW.avg_rating < 2 THEN '1-2'
+                    WHEN NEW.avg_rating < 3 THEN '2-3'
+                    WHEN NEW.avg_rating < 4 THEN '3-4'
+                    WHEN NEW.avg_rating < 5 THEN '4-5'
+                    WHEN NEW.avg_rating < 6 THEN '5-6'
+                    WHEN NEW.avg_rating < 7 THEN '6-7'
+                    WHEN NEW.avg_rating < 8 THEN '7-8'
+                    WHEN NEW.avg_rating < 9 THEN '8-9'
+                    ELSE '9-10'
+                END AS value) AS row_value
+                WHERE value IS NOT NULL
+                ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+            INSERT INTO movie_facets (facet, value, count)
+                SELECT 'price', value, 1
+                FROM (SELECT CASE
+                    WHEN NEW.ticket_price < 100 THEN '0-100'
+                    WHEN NEW.ticket_price < 250 THEN '100-250'
+                    WHEN NEW.ticket_price < 500 THEN '250-500'
+                    WHEN NEW.ticket_price < 1000 THEN '500-1000'
+                    WHEN NEW.ticket_price < 2500 THEN '1000-2500'
+                    WHEN NEW.ticket_price < 5000 THEN '2500-5000'
+                    ELSE '5000+'
+                END AS value) AS row_value
+                WHERE value IS NOT NULL
+                ON CONFLICT (facet, value) DO UPDATE SET count = movie_facets.count + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE TRIGGER movie_facets_update AFTER INSERT OR DELETE OR UPDATE
+        OF genre, director, release_date, avg_rating, ticket_price ON movies
+        FOR EACH ROW EXECUTE FUNCTION movie_facets_update()""",
+]
+
+
+# the seeds of the facets computed the same way on every dialect
+SEEDS = [
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'genre', genre, COUNT(*) FROM movies
+        WHERE genre IS NOT NULL GROUP BY genre""",
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'director', director, COUNT(*) FROM movies
+        WHERE director IS NOT NULL GROUP BY director""",
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'rating', CASE
+            WHEN avg_rating < 2 THEN '1-2'
+            WHEN avg_rating < 3 THEN '2-3'
+            WHEN avg_rating < 4 THEN '3-4'
+            WHEN avg_rating < 5 THEN '4-5'
+            WHEN avg_rating < 6 THEN '5-6'
+            WHEN avg_rating < 7 THEN '6-7'
+            WHEN avg_rating < 8 THEN '7-8'
+            WHEN avg_rating < 9 THEN '8-9'
+            ELSE '9-10'
+        END, COUNT(*) FROM movies GROUP BY 2""",
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'price', CASE
+            WHEN ticket_price < 100 THEN '0-100'
+            WHEN ticket_price < 250 THEN '100-250'
+            WHEN ticket_price < 500 THEN '250-500'
+            WHEN ticket_price < 1000 THEN '500-1000'
+            WHEN ticket_price < 2500 THEN '1000-2500'
+            WHEN ticket_price < 5000 THEN '2500-5000'
+            ELSE '5000+'
+        END, COUNT(*) FROM movies GROUP BY 2""",
+]
+SQLITE_SEEDS = SEEDS + [
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'release_year', CAST(CAST(STRFTIME('%Y', release_date) AS INTEGER) AS VARCHAR), COUNT(*)
+        FROM movies WHERE release_date IS NOT NULL GROUP BY 2""",
+]
+POSTGRESQL_SEEDS = SEEDS + [
+    """INSERT INTO movie_facets (facet, value, count)
+        SELECT 'release_year', CAST(EXTRACT(year FROM release_date) AS VARCHAR), COUNT(*)
+        FROM movies WHERE release_date IS NOT NULL GROUP BY 2""",
+]
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('movie_facets',
+    sa.Column('facet', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('facet', 'value')
+    )
+    # ### end Alembic commands ###
+
+    # seed the counts, the triggers keep them up to date from now on; without
+    # triggers nothing is seeded and facet_counts() falls back to GROUP BY
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        seeds, triggers = SQLITE_SEEDS, SQLITE_TRIGGERS
+    elif dialect == 'postgresql':
+        seeds, triggers = POSTGRESQL_SEEDS, POSTGRESQL_TRIGGERS
+    else:
+        seeds, triggers = [], []
+    for statement in seeds + triggers:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS movie_facets_insert')
+        op.execute('DROP TRIGGER IF EXISTS movie_facets_delete')
+        op.execute('DROP TRIGGER IF EXISTS movie_facets_update')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS movie_facets_update ON movies')
+        op.execute('DROP FUNCTION IF EXISTS movie_facets_update()')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('movie_facets')
+    # ### end Alembic commands ###
@@ -1,11 +1,28 @@
-from flask import request, current_app
+from flask import Response, request, current_app, stream_with_context
 from db.models.movie import Movie
-from init import db
-from schemas.movie import MovieData, movie_data_response
+from db import db
+from schemas.movie import MovieBatchData, MovieData, movie_data_response
+from db.bulk import (
+    EXPORT_FORMATS,
+    IMPORT_FORMATS,
+    batch_movies,
+    export_movies,
+    import_movies,
+    iter_records,
+)
+from db.facets import facet_counts
+from db.filters import FILTER_FIELDS, filter_movies
+from db.projection import parse_fields, project, response_fields
+from db.queries import movie_list_query, movie_search_query, split_page
+from db.counts import movie_count
+from core.cache import cached, invalidate
+from core.serializer import serialize
+from core.conditional import conditional, is_not_modified, validators
 from pydantic import ValidationError
 
 from flask_restx import Namespace, Resource
-from flask_login import login_required, current_user
+from core.auth import auth_required, current_user_id
+from db.routing import read_replica
 
 api = Namespace("movie", description="Movie related functions and routes")
 
@@ -16,7 +33,7 @@ class MovieCreationAndFetching(Resource):
     Movie related functions and routes
     """
 
-    @login_required
+    @auth_required
     def post(self):
         """
         Create a new movie entry in the database
@@ -27,14 +44,14 @@ class MovieCreationAndFetching(Resource):
         try:
             movie_data = MovieData(**request.get_json())
         except ValidationError as e:
-            current_app.logger.error("Validation error: {}".format(e.errors()))
+            current_app.logger.error("Validation error: %s", e.errors())
             return {"validation errors": e.errors()}, 400
         except Exception as e:
-            current_app.logger.error("Exception: {}".format(str(e)))
+            current_app.logger.error("Exception: %s", e)
             return {"message": str(e)}, 400
 
         # insert movie data into database
-        movie_data.user_id = current_user.id
+        movie_data.user_id = current_user_id()
 
         new_movie = Movie(
             title=movie_data.title,
@@ -50,114 +67,291 @@ class MovieCreationAndFetching(Resource):
 
         db.session.add(new_movie)
         db.session.commit()
+        invalidate("movies")
 
         current_app.logger.info(
-            "Movie created successfully id: {}".format(new_movie.id)
+            "Movie created successfully id: %s", new_movie.id
         )
         return {"message": "Movie created successfully"}, 201
 
-    @api.marshal_with(movie_data_response)
+    @api.response(200, "Success", [movie_data_response])
+    @conditional
+    @read_replica
+    @cached("movies")
     def get(self):
         """
         Get all movies from the database movies in the requested page sorted by the requested sort_by parameter
         """
         current_app.logger.info("GET /movie request received.")
 
-        page = request.args.get("page", 1, type=int)
-        movies_per_page = request.args.get("movies_per_page", 10, type=int)
-        sort_by = request.args.get("sort_by", "none", type=str)
-        order_by = request.args.get("order_by", "asc", type=str)
+        try:
+            listing = movie_list_query(request.args)
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": str(e)}, 400
+
+        total = None
+        if listing["check_page"]:
+            # return movie according to the page, the total comes from the
+            # maintained movie count instead of a COUNT(*) scan
+            total = movie_count()
+            if not total:
+                current_app.logger.error("No movies found")
+                return {"message": "No movies found"}, 400
+            if listing["page"] > total // listing["movies_per_page"] + 1:
+                current_app.logger.error("Invalid page number")
+                return {"message": "Invalid page number"}, 400
+
+        movies, headers = split_page(listing["query"].all(), listing, total)
+
+        if not movies:
+            current_app.logger.error("No movies found")
+            return {"message": "No movies found"}, 400
+
+        # answer conditional requests before serializing the movies
+        headers.update(validators(movies, headers, last_modified=False))
+        if is_not_modified(headers):
+            current_app.logger.info("Movies not modified")
+            return None, 304, headers
+
+        current_app.logger.info("Movies retrieved successfully")
+        return serialize(movies, listing["fields"]), 200, headers
+
+
+@api.route("/import")
+class MovieImport(Resource):
+    """
+    Bulk movie import
+    """
+
+    @auth_required
+    def post(self):
+        """
+        Import movies streamed as NDJSON or CSV in the request body
+        """
+        current_app.logger.info("POST /movie/import request received.")
+
+        format = request.args.get("format", None, type=str)
+        if format is None:
+            format = "csv" if request.mimetype == "text/csv" else "ndjson"
+        if format not in IMPORT_FORMATS:
+            current_app.logger.error("Invalid import format")
+            return {"message": "Invalid import format"}, 400
+
+        # the body is read line by line, never buffered as a whole
+        records = iter_records(request.stream, format)
+        report = import_movies(
+            records, current_user_id(), current_app.config["IMPORT_BATCH_SIZE"]
+        )
+        if report["imported"]:
+            invalidate("movies")
+
+        current_app.logger.info(
+            "Movies imported: %s failed: %s", report["imported"], report["failed"]
+        )
+        return report, 200
+
+
+@api.route("/export")
+class MovieExport(Resource):
+    """
+    Bulk movie export
+    """
+
+    @read_replica
+    def get(self):
+        """
+        Stream all movies, or the ones matching the GET /movie filters, as NDJSON or CSV
+        """
+        current_app.logger.info("GET /movie/export request received.")
+
+        format = request.args.get("format", "ndjson", type=str)
         filter_by = request.args.get("filter_by", "none", type=str)
         filter_value = request.args.get("filter_value", "", type=str)
+        release_year_from = request.args.get("release_year_from", "", type=str)
+        release_year_to = request.args.get("release_year_to", "", type=str)
+        # resume an interrupted export after the last received id
+        after_id = request.args.get("after_id", 0, type=int)
+        try:
+            field_names = parse_fields(request.args.get("fields", "", type=str))
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": str(e)}, 400
 
-        # sort_by can only be "release_data" or "ticket_price"
-        if sort_by not in ["release_date", "ticket_price", "none"]:
-            current_app.logger.error("Invalid sort_by parameter")
-            return {"message": "Invalid sort_by parameter"}, 400
-
-        # page can only integer greater than 0
-        if page < 1:
-            current_app.logger.error("Invalid page number")
-            return {"message": "Invalid page number"}, 400
+        if format not in EXPORT_FORMATS:
+            current_app.logger.error("Invalid export format")
+            return {"message": "Invalid export format"}, 400
 
-        # filter_by can only be "genre", "director" or "release_year"
-        if filter_by not in ["genre", "director", "release_year", "none"]:
+        if filter_by not in FILTER_FIELDS + ["none"]:
             current_app.logger.error("Invalid filter_by parameter")
             return {"message": "Invalid filter_by parameter"}, 400
 
-        # get all movies from database
-        movies = None
-        if sort_by == "none":
-            if filter_by == "none":
-                # return movie according to the page
-                movie_count = Movie.query.count()
-                if not movie_count:
-                    current_app.logger.error("No movies found")
-                    return {"message": "No movies found"}, 400
-                else:
-                    if page > movie_count // movies_per_page + 1:
-                        current_app.logger.error("Invalid page number")
-                        return {"message": "Invalid page number"}, 400
-                    else:
-                        movies = Movie.query.paginate(
-                            page=page, per_page=movies_per_page, count=False
-                        ).items
-            else:
-                # return movies according to the filter_by parameter
-                movies = (
-                    Movie.query.filter(
-                        getattr(Movie, filter_by).like("%" + filter_value + "%")
-                    )
-                    .paginate(page=page, per_page=movies_per_page, count=False)
-                    .items
+        try:
+            query = filter_movies(
+                Movie.query, filter_by, filter_value, release_year_from, release_year_to
+            )
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": "Invalid release year"}, 400
+        query = project(query.filter(Movie.id > after_id), field_names)
+
+        mimetype = "text/csv" if format == "csv" else "application/x-ndjson"
+        return Response(
+            stream_with_context(
+                export_movies(query, format, fields=response_fields(field_names))
+            ),
+            mimetype=mimetype,
+        )
+
+
+@api.route("/batch")
+class MovieBatch(Resource):
+    """
+    Batch update and delete of the movies of the current user
+    """
+
+    def selection(self, batch_data: MovieBatchData, user_id: int):
+        """
+        Query of the movies given by ids or by a filter, raises ValueError
+        with the message for the client.
+
+        A filter only selects the movies of user_id, ids select any movie so
+        the ones of other users can be reported as skipped.
+        """
+        if (batch_data.ids is None) == (batch_data.filter_by is None):
+            raise ValueError("Give either ids or filter_by")
+
+        if batch_data.ids is not None:
+            if len(batch_data.ids) > current_app.config["BATCH_MAX_IDS"]:
+                raise ValueError(
+                    "At most {} ids can be given".format(current_app.config["BATCH_MAX_IDS"])
                 )
-        else:
-            if filter_by == "none":
-                # return movies according to the sort_by parameter
-                if order_by == "asc":
-                    movies = (
-                        Movie.query.order_by(getattr(Movie, sort_by).asc())
-                        .paginate(page=page, per_page=movies_per_page, count=False)
-                        .items
-                    )
-                else:
-                    movies = (
-                        Movie.query.order_by(getattr(Movie, sort_by).desc())
-                        .paginate(page=page, per_page=movies_per_page, count=False)
-                        .items
-                    )
-            else:
-                # return movies according to the sort_by and filter_by parameters
-                if order_by == "asc":
-                    movies = (
-                        Movie.query.filter(
-                            getattr(Movie, filter_by).like("%" + filter_value + "%")
-                        )
-                        .order_by(getattr(Movie, sort_by).asc())
-                        .paginate(page=page, per_page=movies_per_page, count=False)
-                        .items
-                    )
-                else:
-                    movies = (
-                        Movie.query.filter(
-                            getattr(Movie, filter_by).like("%" + filter_value + "%")
-                        )
-                        .order_by(getattr(Movie, sort_by).desc())
-                        .paginate(page=page, per_page=movies_per_page, count=False)
-                        .items
-                    )
+            return Movie.query.filter(Movie.id.in_(batch_data.ids))
 
-        if not movies:
-            current_app.logger.error("No movies found")
-            return {"message": "No movies found"}, 400
+        if batch_data.filter_by not in FILTER_FIELDS:
+            raise ValueError("Invalid filter_by parameter")
+        # an empty value would match every movie of the user
+        if not batch_data.filter_value:
+            raise ValueError("filter_value is required")
+        try:
+            return filter_movies(
+                Movie.query.filter(Movie.user_id == user_id),
+                batch_data.filter_by,
+                batch_data.filter_value,
+                batch_data.release_year_from,
+                batch_data.release_year_to,
+            )
+        except ValueError:
+            raise ValueError("Invalid release year")
 
-        current_app.logger.info("Movies retrieved successfully")
-        return movies
+    def batch(self, action: str):
+        """
+        Update or delete the selected movies, action is "updated" or "deleted"
+        """
+        try:
+            batch_data = MovieBatchData(**request.get_json())
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+            current_app.logger.error("Validation error: %s", errors)
+            return {"validation errors": errors}, 400
+        except Exception as e:
+            current_app.logger.error("Exception: %s", e)
+            return {"message": str(e)}, 400
+
+        changes = None
+        if action == "updated":
+            if batch_data.changes is not None:
+                changes = batch_data.changes.model_dump(exclude_unset=True, exclude={"user_id"})
+            # an empty update would still bump updated_at and drop the cached responses
+            if not changes:
+                current_app.logger.error("No changes given")
+                return {"message": "No changes given"}, 400
+
+        user_id = current_user_id()
+        try:
+            query = self.selection(batch_data, user_id)
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": str(e)}, 400
+
+        # one ownership query and one bulk statement, whatever the number of
+        # movies, a filter selecting more than BATCH_MAX_IDS movies is refused
+        try:
+            report = batch_movies(
+                query, user_id, batch_data.ids, changes, current_app.config["BATCH_MAX_IDS"]
+            )
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": str(e)}, 400
+        invalidate("movies", *["movie:{}".format(movie_id) for movie_id in report["ids"]])
+
+        current_app.logger.info(
+            "Movies %s: %s skipped: %s", action, len(report["ids"]), len(report["skipped"])
+        )
+        return {
+            "message": "Movies {} successfully".format(action),
+            action: report["ids"],
+            "skipped": report["skipped"],
+        }, 200
+
+    @auth_required
+    def patch(self):
+        """
+        Apply the same changes to many movies, given by ids or by a filter
+        """
+        current_app.logger.info("PATCH /movie/batch request received.")
+        return self.batch("updated")
+
+    @auth_required
+    def delete(self):
+        """
+        Delete many movies, given by ids or by a filter
+        """
+        current_app.logger.info("DELETE /movie/batch request received.")
+        return self.batch("deleted")
+
+
+@api.route("/facets")
+class MovieFacets(Resource):
+    """
+    Movie counts per genre, director, release year, rating and price
+    """
+
+    @read_replica
+    @cached("movies")
+    def get(self):
+        """
+        Count the movies per facet value, all movies or the ones matching the GET /movie filters
+        """
+        current_app.logger.info("GET /movie/facets request received.")
+
+        filter_by = request.args.get("filter_by", "none", type=str)
+        filter_value = request.args.get("filter_value", "", type=str)
+        release_year_from = request.args.get("release_year_from", "", type=str)
+        release_year_to = request.args.get("release_year_to", "", type=str)
+
+        if filter_by not in FILTER_FIELDS + ["none"]:
+            current_app.logger.error("Invalid filter_by parameter")
+            return {"message": "Invalid filter_by parameter"}, 400
+
+        query = None
+        if filter_by != "none" or release_year_from or release_year_to:
+            try:
+                query = filter_movies(
+                    Movie.query, filter_by, filter_value, release_year_from, release_year_to
+                )
+            except ValueError as e:
+                current_app.logger.error(str(e))
+                return {"message": "Invalid release year"}, 400
+
+        facets = facet_counts(query, current_app.config["FACET_LIMIT"])
+        current_app.logger.info("Movie facets retrieved successfully")
+        return facets, 200
 
 
 @api.route("/<int:movie_id>")
 class MovieIDOperations(Resource):
-    @login_required
+    @auth_required
     def put(self, movie_id: int):
         """
         Update a movie entry in the database
@@ -168,20 +362,21 @@ class MovieIDOperations(Resource):
         try:
             movie_data = MovieData(**request.get_json())
         except ValidationError as e:
-            current_app.logger.error("Validation error: {}".format(e.errors()))
+            current_app.logger.error("Validation error: %s", e.errors())
             return {"validation errors": e.errors()}, 400
         except Exception as e:
-            current_app.logger.error("Exception: {}".format(str(e)))
+            current_app.logger.error("Exception: %s", e)
             return {"message": str(e)}, 400
 
-        user_id = current_user.email
+        user_id = current_user_id()
         # update movie data in database
         movie = Movie.query.filter_by(id=movie_id).first()
         if not movie:
-            current_app.logger.error("movie with id {} does not exist".format(movie_id))
+            current_app.logger.error("movie with id %s does not exist", movie_id)
             return {"message": "Movie does not exist"}, 400
 
-        if movie.created_by.email != user_id:
+        # compare the owner id directly instead of loading movie.created_by
+        if movie.user_id != user_id:
             current_app.logger.error("You can only update movies created by you")
             return {"message": "You can only update movies created by you"}, 400
 
@@ -195,35 +390,41 @@ class MovieIDOperations(Resource):
         movie.cast = movie_data.cast
 
         db.session.commit()
+        invalidate("movies", "movie:{}".format(movie_id))
 
-        current_app.logger.info("Movie updated successfully id: {}".format(movie.id))
+        current_app.logger.info("Movie updated successfully id: %s", movie.id)
         return {"message": "Movie updated successfully"}, 200
 
-    @login_required
+    @auth_required
     def delete(self, movie_id: int):
         """
         Delete a movie entry from the database
         """
 
         current_app.logger.info("DELETE /movie/<movie_id> request received.")
-        user_id = current_user.email
+        user_id = current_user_id()
         # delete movie from database
         movie = Movie.query.filter_by(id=movie_id).first()
         if not movie:
-            current_app.logger.error("movie with id {} does not exist".format(movie_id))
+            current_app.logger.error("movie with id %s does not exist", movie_id)
             return {"message": "Movie does not exist"}, 400
 
-        if movie.created_by.email != user_id:
+        # compare the owner id directly instead of loading movie.created_by
+        if movie.user_id != user_id:
             current_app.logger.error("You can only delete movies created by you")
             return {"message": "You can only delete movies created by you"}, 400
 
         db.session.delete(movie)
         db.session.commit()
+        invalidate("movies", "movie:{}".format(movie_id))
 
-        current_app.logger.info("Movie deleted successfully id: {}".format(movie.id))
+        current_app.logger.info("Movie deleted successfully id: %s", movie.id)
         return {"message": "Movie deleted successfully"}, 200
 
-    @api.marshal_with(movie_data_response)
+    @api.response(200, "Success", movie_data_response)
+    @conditional
+    @read_replica
+    @cached(lambda movie_id: "movie:{}".format(movie_id))
     def get(self, movie_id: int):
         """
         Get a movie entry from the database by id
@@ -232,17 +433,28 @@ class MovieIDOperations(Resource):
         # get movie from database
         if movie_id is not None:
             current_app.logger.info("GET /movie/<movie_id> request received.")
-            movie = Movie.query.filter_by(id=movie_id).first()
+            try:
+                field_names = parse_fields(request.args.get("fields", "", type=str))
+            except ValueError as e:
+                current_app.logger.error(str(e))
+                return {"message": str(e)}, 400
+
+            movie = project(Movie.query, field_names).filter_by(id=movie_id).first()
             if not movie:
                 current_app.logger.error(
-                    "movie with id {} does not exist".format(movie_id)
+                    "movie with id %s does not exist", movie_id
                 )
                 return {"message": "Movie does not exist"}, 400
 
+            headers = validators([movie])
+            if is_not_modified(headers):
+                current_app.logger.info("Movie not modified id: %s", movie.id)
+                return None, 304, headers
+
             current_app.logger.info(
-                "Movie retrieved successfully id: {}".format(movie.id)
+                "Movie retrieved successfully id: %s", movie.id
             )
-            return movie, 200
+            return serialize(movie, response_fields(field_names)), 200, headers
         else:
             return {"message": "Invalid movie id"}, 400
 
@@ -253,40 +465,32 @@ class MovieSearchAPI(Resource):
     Search functionality
     """
 
-    @api.marshal_with(movie_data_response)
+    @api.response(200, "Success", [movie_data_response])
+    @conditional
+    @read_replica
+    @cached("movies")
     def get(self):
         """
         Get all movies from the database that match the search criteria
         """
         current_app.logger.info("GET /movie/search request received.")
 
-        search_param = request.args.get("search_param", "", type=str)
-        search_value = request.args.get("search_value", "", type=str)
-        page = request.args.get("page", 1, type=int)
-        movies_per_page = request.args.get("movies_per_page", 10, type=int)
-
-        # search_param can only be "title", "genre", "description", "director" or "cast"
-        if search_param not in ["title", "genre", "description", "director", "cast"]:
-            current_app.logger.error("Invalid search parameter provided")
-            return {"message": "Invalid search parameter"}, 400
-
-        # search value can not be empty
-        if not search_value or search_value == "":
-            current_app.logger.error("Invalid search value provided")
-            return {"message": "Invalid search value"}, 400
-
-        # search the database for movies that match the search criteria
-        movies = (
-            Movie.query.filter(
-                getattr(Movie, search_param).like("%{}%".format(search_value))
-            )
-            .paginate(page=page, per_page=movies_per_page, count=False)
-            .items
-        )
+        try:
+            listing = movie_search_query(request.args)
+        except ValueError as e:
+            current_app.logger.error(str(e))
+            return {"message": str(e)}, 400
+
+        movies, headers = split_page(listing["query"].all(), listing)
 
         if not movies:
             current_app.logger.error("No movies found")
             return {"message": "No movies found"}, 400
 
+        headers.update(validators(movies, headers, last_modified=False))
+        if is_not_modified(headers):
+            current_app.logger.info("GET /movie/search not modified.")
+            return None, 304, headers
+
         current_app.logger.info("GET /movie/search request successful.")
-        return movies, 200
+        return serialize(movies, listing["fields"]), 200, headers
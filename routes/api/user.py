@@ -3,11 +3,11 @@ from flask import current_app, request
 from pydantic import ValidationError
 from schemas.user import UserRegistrationData, UserLoginData
 from db.models.user import User
-from core.security import get_hashed_password, verify_password
+from core.security import get_hashed_password, needs_rehash, verify_password
 
 from flask_restx import Namespace, Resource
 from flask_login import login_required, login_user, logout_user
-from app import login_manager
+from flask_jwt_extended import create_access_token
 
 api = Namespace("user", description="User related operations (login, logout, register)")
 
@@ -24,10 +24,10 @@ class UserRegistration(Resource):
         try:
             user_data = UserRegistrationData(**request.get_json())
         except ValidationError as e:
-            current_app.logger.error("Validation error: {}".format(e.errors()))
+            current_app.logger.error("Validation error: %s", e.errors())
             return {"validation errors": e.errors()}, 400
         except Exception as e:
-            current_app.logger.error("Exception: {}".format(str(e)))
+            current_app.logger.error("Exception: %s", e)
             return {"message": str(e)}, 400
 
         name = user_data.name
@@ -40,7 +40,11 @@ class UserRegistration(Resource):
             current_app.logger.error("User already exists")
             return {"message": "User already exists"}, 400
         # hash the password
-        hashed_password = get_hashed_password(password)
+        try:
+            hashed_password = get_hashed_password(password)
+        except TimeoutError:
+            current_app.logger.error("Password hashing timed out")
+            return {"message": "Server is busy, try again later"}, 503
         # create new user
         new_user = User(name=name, email=email, password=hashed_password)
         db.session.add(new_user)
@@ -61,7 +65,7 @@ class UserLogin(Resource):
         try:
             user_data = UserLoginData(**request.get_json())
         except ValidationError as e:
-            current_app.logger.error("Validation error: {}".format(e.errors()))
+            current_app.logger.error("Validation error: %s", e.errors())
             return {"validation errors": e.errors()}, 400
         email = user_data.email
         password = user_data.password
@@ -72,15 +76,33 @@ class UserLogin(Resource):
             current_app.logger.error("User does not exist")
             return {"message": "User does not exist"}, 400
         # check if password is correct
-        if not verify_password(password.encode("utf-8"), user.password):
+        try:
+            password_is_correct = verify_password(password.encode("utf-8"), user.password)
+        except TimeoutError:
+            current_app.logger.error("Password verification timed out")
+            return {"message": "Server is busy, try again later"}, 503
+        if not password_is_correct:
             current_app.logger.error("Incorrect password has been provided")
             return {"message": "Incorrect password"}, 400
 
-        # login using flask_login
+        # upgrade the hash when BCRYPT_ROUNDS has changed
+        if needs_rehash(user.password):
+            try:
+                user.password = get_hashed_password(password)
+            except TimeoutError:
+                # the password is correct, the hash is upgraded on a later login
+                current_app.logger.warning("Password hash upgrade timed out")
+            else:
+                db.session.commit()
+                current_app.logger.info("Password hash upgraded")
+
+        # login using flask_login for session clients
         login_user(user)
+        # and return a signed token carrying the user id for stateless clients
+        access_token = create_access_token(identity=str(user.id))
 
         current_app.logger.info("User logged in successfully")
-        return {"message": "User logged in successfully"}, 200
+        return {"message": "User logged in successfully", "access_token": access_token}, 200
 
 
 @api.route("/logout")
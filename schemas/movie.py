@@ -1,9 +1,12 @@
-from pydantic import BaseModel, validator, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, field_validator
+from pydantic_core import PydanticCustomError
 from datetime import date
+from typing import List, Optional
 import regex as re
-from routes import api
 from flask_restx import Model, fields
 
+CONTENT_RE = re.compile(r"[a-zA-Z0-9_\.!, -]*")
+
 
 class MovieData(BaseModel):
     """Movie data schema"""
@@ -18,23 +21,58 @@ class MovieData(BaseModel):
     cast: str = Field(..., min_length=2, max_length=200)
     user_id: EmailStr = None
 
-    @validator("release_date")
+    @field_validator("release_date")
+    @classmethod
     def is_valid_date(cls, v):
-        re_exp = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-        if not re_exp.match(str(v)):
-            raise Exception("Invalid date format")
+        # the format is already checked by the date parsing
         if v > date.today():
-            raise Exception("Release date must be in the past")
+            raise PydanticCustomError("future_date", "Release date must be in the past")
         return v
 
-    @validator("title", "description", "director", "genre", "cast")
+    @field_validator("title", "description", "director", "genre", "cast")
+    @classmethod
     def is_valid_content_string(cls, v):
-        reg_exp = re.compile(r"^[a-zA-Z0-9_\.!, -]*$")
-        if not reg_exp.match(v):
-            raise Exception("Invalid characters in {}".format(v))
+        if not CONTENT_RE.fullmatch(v):
+            raise PydanticCustomError(
+                "invalid_characters", "Invalid characters in {value}", {"value": v}
+            )
+        return v
+
+
+class MovieUpdateData(MovieData):
+    """Partial movie data schema, only the given fields are changed"""
+
+    title: Optional[str] = Field(None, min_length=2, max_length=50)
+    description: Optional[str] = Field(None, min_length=15, max_length=250)
+    release_date: Optional[date] = Field(None, description="Date format: YYYY-MM-DD")
+    director: Optional[str] = Field(None, min_length=2, max_length=50)
+    genre: Optional[str] = Field(None, min_length=2, max_length=50)
+    avg_rating: Optional[float] = Field(None, ge=1, le=10)
+    ticket_price: Optional[float] = Field(None, ge=0)
+    cast: Optional[str] = Field(None, min_length=2, max_length=200)
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def is_not_null(cls, v):
+        if v is None:
+            raise PydanticCustomError("not_null", "Value can not be null")
         return v
 
 
+class MovieBatchData(BaseModel):
+    """Batch update/delete schema, the movies are given by ids or by a filter"""
+
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    filter_by: Optional[str] = None
+    filter_value: str = ""
+    release_year_from: str = ""
+    release_year_to: str = ""
+    changes: Optional[MovieUpdateData] = None
+
+
+# validates a list of movies in one call, e.g. a batch of imported records
+movie_list_adapter = TypeAdapter(List[MovieData])
+
 movie_data_response = Model(
     "MovieDataResponse",
     {
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic_core import PydanticCustomError
 
 
 class UserRegistrationData(BaseModel):
@@ -7,22 +8,24 @@ class UserRegistrationData(BaseModel):
     email: EmailStr
     password: str = Field(..., min_length=8, max_length=50)
 
-    @validator("name")
+    @field_validator("name")
+    @classmethod
     def is_valid_name(cls, value):
         """Validate name"""
         if not value.replace(" ", "").isalpha():
-            raise Exception("name must contain only alphabets")
+            raise PydanticCustomError("invalid_name", "name must contain only alphabets")
         return value
 
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def is_good_password(cls, value):
         """Validate password"""
         if not any(char.isdigit() for char in value):
-            raise Exception("password must contain at least one digit")
+            raise PydanticCustomError("weak_password", "password must contain at least one digit")
         if not any(char.isupper() for char in value):
-            raise Exception("password must contain at least one uppercase letter")
+            raise PydanticCustomError("weak_password", "password must contain at least one uppercase letter")
         if not any(char.islower() for char in value):
-            raise Exception("password must contain at least one lowercase letter")
+            raise PydanticCustomError("weak_password", "password must contain at least one lowercase letter")
         return value
 
 class UserLoginData(BaseModel):
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask_migrate import upgrade  # noqa: E402
+
+from init import create_app, init_migrate  # noqa: E402
+
+USER = {"name": "Owner", "email": "owner@example.com", "password": "Secret1pass"}
+OTHER_USER = {"name": "Other", "email": "other@example.com", "password": "Secret1pass"}
+
+
+def movie_data(i: int, **changes) -> dict:
+    """
+    Valid movie body number i, with changes applied
+    """
+    return dict(
+        {
+            "title": "movie {}".format(i),
+            "description": "the description of movie {}".format(i),
+            "release_date": "{}-01-01".format(1990 + i % 20),
+            "director": "director {}".format(i % 3),
+            "genre": ["action", "comedy", "drama"][i % 3],
+            "avg_rating": 1 + i % 9,
+            "ticket_price": 100 + 10 * (i % 7),
+            "cast": "actor {}".format(i),
+        },
+        **changes
+    )
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///{}".format(tmp_path / "app.db"),
+            "SECRET_KEY": "a test secret key of at least 32 bytes",
+            "CACHE_TYPE": "lru",
+            "BCRYPT_ROUNDS": 4,
+            "LOG_FILE": str(tmp_path / "app.log"),
+        }
+    )
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, user: dict) -> dict:
+    """
+    Register and log in user, returns the Authorization header of its token
+    """
+    client.post("/user/register", json=user)
+    response = client.post("/user/login", json=user)
+    assert response.status_code == 200, response.get_json()
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def auth(client):
+    return login(client, USER)
+
+
+@pytest.fixture
+def other_auth(client):
+    return login(client, OTHER_USER)
+
+
+@pytest.fixture
+def add_movies(client, auth):
+    """
+    Create count movies owned by the USER, numbered from start
+    """
+
+    def add(count: int, start: int = 0, headers: dict = None, **changes):
+        for i in range(start, start + count):
+            response = client.post("/movie/", headers=headers or auth, json=movie_data(i, **changes))
+            assert response.status_code == 201, response.get_json()
+
+    return add
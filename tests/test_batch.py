@@ -0,0 +1,43 @@
+def test_batch_update_without_changes(client, auth, add_movies):
+    add_movies(2)
+    etag = client.get("/movie/1").headers["ETag"]
+    for body in ({"ids": [1, 2]}, {"ids": [1, 2], "changes": {}}):
+        response = client.patch("/movie/batch", headers=auth, json=body)
+        assert response.status_code == 400
+        assert response.get_json() == {"message": "No changes given"}
+    assert client.get("/movie/1").headers["ETag"] == etag
+
+
+def test_batch_filter_selects_own_movies_only(app, client, auth, other_auth, add_movies):
+    add_movies(3, genre="drama")
+    add_movies(3, start=3, headers=other_auth, genre="drama")
+    app.config["BATCH_MAX_IDS"] = 3
+
+    body = {"filter_by": "genre", "filter_value": "drama", "changes": {"ticket_price": 5}}
+    response = client.patch("/movie/batch", headers=auth, json=body)
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == [1, 2, 3]
+    assert response.get_json()["skipped"] == []
+    assert client.get("/movie/4").get_json()["ticket_price"] != 5
+
+    add_movies(1, start=6, genre="drama")
+    assert client.patch("/movie/batch", headers=auth, json=body).status_code == 400
+
+
+def test_batch_ids_report_skipped(client, auth, other_auth, add_movies):
+    add_movies(1)
+    add_movies(1, start=1, headers=other_auth)
+    response = client.delete("/movie/batch", headers=auth, json={"ids": [1, 2, 9]})
+    assert response.get_json()["deleted"] == [1]
+    assert response.get_json()["skipped"] == [
+        {"id": 2, "reason": "not owned"},
+        {"id": 9, "reason": "not found"},
+    ]
+
+
+def test_batch_filter_requires_value(client, auth, add_movies):
+    add_movies(2)
+    for filter_by in ("genre", "director", "release_year"):
+        response = client.delete("/movie/batch", headers=auth, json={"filter_by": filter_by})
+        assert response.status_code == 400
+    assert len(client.get("/movie/").get_json()) == 2
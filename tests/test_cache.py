@@ -0,0 +1,104 @@
+import pytest
+
+from conftest import movie_data
+from core.cache import LRUCache, RedisCache
+
+
+class FakeRedis:
+    """
+    Local stand-in for redis.Redis, with the get, set and incr used by RedisCache
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self.expires[key] = ex
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode("utf-8")
+        return int(self.values[key])
+
+
+@pytest.fixture(params=["lru", "redis"])
+def cached_client(request, app, client, add_movies):
+    if request.param == "redis":
+        app.extensions["cache"] = RedisCache(FakeRedis(), ttl=60)
+    add_movies(3)
+    return client
+
+
+def cache_status(client, url: str) -> str:
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.headers["X-Cache"]
+
+
+def test_hit_after_miss(cached_client):
+    for url in ("/movie/", "/movie/1", "/movie/search?search_param=title&search_value=movie"):
+        assert cache_status(cached_client, url) == "MISS"
+        assert cache_status(cached_client, url) == "HIT"
+
+
+def test_post_invalidates_lists_only(cached_client, auth):
+    for url in ("/movie/", "/movie/1"):
+        cache_status(cached_client, url)
+    assert cached_client.post("/movie/", headers=auth, json=movie_data(9)).status_code == 201
+
+    assert cache_status(cached_client, "/movie/") == "MISS"
+    assert cache_status(cached_client, "/movie/1") == "HIT"
+
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_write_drops_its_movie_only(cached_client, auth, method):
+    for url in ("/movie/", "/movie/1", "/movie/2"):
+        cache_status(cached_client, url)
+    response = getattr(cached_client, method)("/movie/2", headers=auth, json=movie_data(2, title="changed"))
+    assert response.status_code == 200
+
+    assert cache_status(cached_client, "/movie/") == "MISS"
+    assert cache_status(cached_client, "/movie/1") == "HIT"
+    if method == "put":
+        assert cache_status(cached_client, "/movie/2") == "MISS"
+        assert cached_client.get("/movie/2").get_json()["title"] == "changed"
+    else:
+        assert cached_client.get("/movie/2").status_code == 400
+
+
+def test_redis_cache_stores_with_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30)
+    cache.set("movies:0:/movie/", [{"id": 1}, 200, {}])
+    assert cache.get("movies:0:/movie/") == [{"id": 1}, 200, {}]
+    assert client.expires["movie_api:movies:0:/movie/"] == 30
+    cache.bump("movies")
+    assert cache.generation("movies") == 1
+    assert cache.stats() == {"hits": 1, "misses": 0}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
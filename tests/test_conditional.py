@@ -0,0 +1,23 @@
+def test_page_has_etag_and_no_last_modified(client, add_movies):
+    add_movies(5)
+    response = client.get("/movie/?movies_per_page=3")
+    assert "ETag" in response.headers
+    assert "Last-Modified" not in response.headers
+
+
+def test_delete_changes_page_etag(client, auth, add_movies):
+    add_movies(5)
+    etag = client.get("/movie/?movies_per_page=3").headers["ETag"]
+    assert client.get("/movie/?movies_per_page=3", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.delete("/movie/2", headers=auth).status_code == 200
+    response = client.get("/movie/?movies_per_page=3", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [movie["title"] for movie in response.get_json()] == ["movie 0", "movie 2", "movie 3"]
+
+
+def test_movie_last_modified(client, add_movies):
+    add_movies(1)
+    last_modified = client.get("/movie/1").headers["Last-Modified"]
+    response = client.get("/movie/1", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
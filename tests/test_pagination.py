@@ -0,0 +1,82 @@
+import base64
+import json
+
+import pytest
+
+
+def walk(client, url: str) -> list:
+    """
+    Ids of every movie returned by following the cursors of url from the start
+    """
+    ids = []
+    cursor = ""
+    while True:
+        response = client.get("{}&cursor={}".format(url, cursor))
+        assert response.status_code == 200, response.get_json()
+        ids.extend(movie["id"] for movie in response.get_json())
+        if response.headers["X-Has-Next"] == "false":
+            assert "X-Next-Cursor" not in response.headers
+            return ids
+        cursor = response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize("sort_by", ["none", "release_date", "ticket_price"])
+@pytest.mark.parametrize("order_by", ["asc", "desc"])
+def test_cursor_walk_has_no_duplicates_or_gaps(app, client, add_movies, sort_by, order_by):
+    # 7 ticket prices and 20 release years for 45 movies, so pages split ties
+    add_movies(45)
+    ids = walk(client, "/movie/?movies_per_page=4&sort_by={}&order_by={}".format(sort_by, order_by))
+    assert sorted(ids) == list(range(1, 46))
+
+    with app.app_context():
+        from db.models.movie import Movie
+
+        column = Movie.id if sort_by == "none" else getattr(Movie, sort_by)
+        key = [(getattr(movie, column.key), movie.id) for movie in Movie.query.all()]
+    expected = [movie_id for _, movie_id in sorted(key, reverse=order_by == "desc")]
+    assert ids == expected
+
+
+def test_search_cursor_walk(client, add_movies):
+    add_movies(10)
+    ids = walk(client, "/movie/search?search_param=title&search_value=movie&movies_per_page=3")
+    assert ids == list(range(1, 11))
+
+
+def cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "sort_by=release_date&order_by=asc&cursor=" + cursor(
+            {"sort_by": "release_date", "order_by": "asc", "value": 5, "id": 1}
+        ),
+        "sort_by=release_date&order_by=asc&cursor=" + cursor(
+            {"sort_by": "release_date", "order_by": "asc", "value": "not a date", "id": 1}
+        ),
+        "sort_by=ticket_price&order_by=asc&cursor=" + cursor(
+            {"sort_by": "ticket_price", "order_by": "asc", "value": "100", "id": 1}
+        ),
+        "cursor=" + cursor({"sort_by": "id", "order_by": "asc", "id": {"a": 1}}),
+        "cursor=" + cursor({"sort_by": "id", "order_by": "asc", "id": True}),
+        "cursor=" + cursor([1]),
+        "cursor=not-base64!",
+        "sort_by=ticket_price&order_by=asc&cursor=" + cursor(
+            {"sort_by": "release_date", "order_by": "asc", "value": "2000-01-01", "id": 1}
+        ),
+    ],
+)
+def test_tampered_cursor(client, add_movies, query):
+    add_movies(3)
+    response = client.get("/movie/?" + query)
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Invalid cursor"}
+
+
+def test_tampered_search_cursor(client, add_movies):
+    add_movies(3)
+    tampered = cursor({"sort_by": "id", "order_by": "asc", "id": "1"})
+    response = client.get("/movie/search?search_param=title&search_value=movie&cursor=" + tampered)
+    assert response.status_code == 400
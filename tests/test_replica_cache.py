@@ -0,0 +1,85 @@
+"""
+Read-your-writes with the response cache on, the primary and the read
+replica being two SQLite files. The replica is a copy of the primary that
+never receives the later writes, i.e. a replica lagging forever.
+"""
+import shutil
+
+import pytest
+from flask_migrate import upgrade
+
+from init import create_app, init_migrate
+
+MOVIE = {
+    "title": "original",
+    "description": "a movie about a movie",
+    "release_date": "2000-01-01",
+    "director": "director",
+    "genre": "drama",
+    "avg_rating": 5,
+    "ticket_price": 100,
+    "cast": "actor",
+}
+
+
+@pytest.fixture
+def app(tmp_path):
+    primary = tmp_path / "primary.db"
+    replica = tmp_path / "replica.db"
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///{}".format(primary),
+            "SQLALCHEMY_BINDS": {"replica_0": "sqlite:///{}".format(replica)},
+            "SECRET_KEY": "a test secret key of at least 32 bytes",
+            "CACHE_TYPE": "lru",
+            "BCRYPT_ROUNDS": 4,
+            "LOG_FILE": str(tmp_path / "app.log"),
+        }
+    )
+    with app.app_context():
+        init_migrate(app)
+        upgrade()
+    yield app
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+@pytest.fixture
+def writer(app, tmp_path):
+    """
+    Logged in client owning movie 1, created before the replica was copied
+    """
+    client = app.test_client()
+    user = {"name": "Writer", "email": "writer@example.com", "password": "Secret1pass"}
+    assert client.post("/user/register", json=user).status_code == 201
+    assert client.post("/user/login", json=user).status_code == 200
+    assert client.post("/movie/", json=MOVIE).status_code == 201
+    shutil.copy(tmp_path / "primary.db", tmp_path / "replica.db")
+    # the cookie set by the writes above has served its purpose
+    client.delete_cookie("read_primary_until")
+    return client
+
+
+def test_writer_reads_own_write_after_replica_response_is_cached(app, writer):
+    reader = app.test_client()
+    assert writer.get("/movie/1").get_json()["title"] == "original"
+
+    response = writer.put("/movie/1", json=dict(MOVIE, title="updated"))
+    assert response.status_code == 200
+    assert writer.get_cookie("read_primary_until") is not None
+
+    # another client reads the lagging replica and caches its response
+    response = reader.get("/movie/1")
+    assert response.get_json()["title"] == "original"
+    assert response.headers["X-Cache"] == "MISS"
+
+    response = writer.get("/movie/1")
+    assert response.get_json()["title"] == "updated"
+    assert reader.get("/movie/1").headers["X-Cache"] == "HIT"
+
+
+def test_writer_reads_own_write_in_listing(app, writer):
+    reader = app.test_client()
+    assert writer.put("/movie/1", json=dict(MOVIE, title="updated")).status_code == 200
+
+    assert reader.get("/movie/").get_json()[0]["title"] == "original"
+    assert writer.get("/movie/").get_json()[0]["title"] == "updated"